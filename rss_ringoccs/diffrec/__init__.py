@@ -49,7 +49,10 @@
         Special Functions:
             fresnel_sin.........The Fresnel sine integral.
             fresnel_cos.........The Fresnel cosine integral.
+            fresnel_cs..........Both Fresnel integrals in one call.
             sq_well_solve.......Diffraction pattern through square well.
+            sq_well_solve_batch.Square well patterns for many wells.
+            slit_diffraction....Single or double slit diffraction pattern.
             compute_norm_eq.....Computes the normalized equivalent width.
             resolution_inverse..Computes the inverse of the function
                                 y = x/(exp(-x)+x-1)
@@ -12,7 +12,9 @@
 """
 # Import dependencies for the diffcorr module
 import numpy as np
-from scipy.special import lambertw, iv
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import fftconvolve
+from scipy.special import lambertw, i0
 from rss_ringoccs.tools.history import write_history_dict
 from rss_ringoccs.tools.write_output_files import write_output_files
 
@@ -33,6 +35,25 @@ IV0_20 = 87.10850209627940
 IV0_25 = 373.02058499037486
 IV0_35 = 7257.7994923041760
 
+# Maximum number of kernel elements computed at once by __ftrans.
+FTRANS_BLOCK_SIZE = 262144
+
+# Number of points between progress messages in verbose mode.
+VERBOSE_STRIDE = 1024
+
+# Newton-Raphson for the stationary azimuth angle stops once every
+# |dpsi/dphi| in a window is below NEWTON_TOL, or after NEWTON_MAX_ITER
+# steps. Most points converge in two or three steps.
+NEWTON_TOL = 1.0e-4
+NEWTON_MAX_ITER = 6
+
+# Row length above which _max_abs_rows avoids forming |arr|.
+MAX_ABS_ROW_SIZE = 200
+
+# Relative spread in the psi coefficients below which a block of points
+# is treated as having a single Fresnel kernel.
+FFT_KERNEL_RTOL = 1.0e-13
+
 # Dictionary containing regions of interest within the Saturnian Rings.
 region_dict = {
     'all':             [1.0, 400000.0],
@@ -58,6 +79,200 @@ region_dict = {
     'titanringlet':    [77870.0, 77930.0]
 }
 
+# Status codes returned by _validate_dlp_arrays.
+STATUS_OK = 0
+STATUS_NONREAL = 1
+STATUS_TOO_SHORT = 2
+STATUS_BAD_SIZE = 3
+STATUS_NEGATIVE = 4
+STATUS_ZERO = 5
+STATUS_ABOVE_TWO_PI = 6
+
+# Checks run on the DLP arrays, in order. Each entry holds the attribute
+# name, a short label for error messages, the checks to run, and the
+# tolerance used for the STATUS_ABOVE_TWO_PI check.
+_DLP_CHECKS = (
+    ("rho_km_vals", "radius",
+     (STATUS_NONREAL, STATUS_TOO_SHORT, STATUS_NEGATIVE), 0.0),
+    ("p_norm_vals", "power",
+     (STATUS_BAD_SIZE, STATUS_NEGATIVE, STATUS_NONREAL), 0.0),
+    ("phase_rad_vals", "phase",
+     (STATUS_BAD_SIZE, STATUS_NONREAL, STATUS_ABOVE_TWO_PI), 1.0e-8),
+    ("B_rad_vals", "B",
+     (STATUS_BAD_SIZE, STATUS_ABOVE_TWO_PI, STATUS_NONREAL), 1.0e-8),
+    ("D_km_vals", "D",
+     (STATUS_BAD_SIZE, STATUS_NONREAL, STATUS_NEGATIVE, STATUS_ZERO), 0.0),
+    ("phi_rad_vals", "angle",
+     (STATUS_BAD_SIZE, STATUS_NONREAL, STATUS_ABOVE_TWO_PI), 1.0e-6),
+    ("f_sky_hz_vals", "frequency",
+     (STATUS_BAD_SIZE, STATUS_NONREAL, STATUS_NEGATIVE, STATUS_ZERO), 0.0),
+    ("rho_dot_kms_vals", "velocity",
+     (STATUS_BAD_SIZE, STATUS_NONREAL), 0.0)
+)
+
+# Exception type and message template for each failing status code.
+_DLP_ERRORS = {
+    STATUS_NONREAL: (
+        ValueError,
+        "\t%(name)s is not an array of real\n"
+        "\tvalued floating point numbers. Please\n"
+        "\tcheck your DLP class for errors.\n"
+        "\tFirst offending index: %(index)d\n"
+    ),
+    STATUS_TOO_SHORT: (
+        IndexError,
+        "\t%(name)s has less than 2 points.\n"
+        "\tIt is impossible to do reconstruction.\n"
+        "\tPlease check your input data.\n"
+    ),
+    STATUS_BAD_SIZE: (
+        IndexError,
+        "\tBad DLP: len(%(label)s) != len(rho)\n"
+        "\tThe number of data points in %(label)s is\n"
+        "\tnot equal to the number of data points\n"
+        "\tin radius. Check the input DLP\n"
+        "\tinstance for any errors.\n"
+    ),
+    STATUS_NEGATIVE: (
+        ValueError,
+        "\tThere are negative values in %(name)s.\n"
+        "\tCheck the DLP instance for errors.\n"
+        "\tFirst offending index: %(index)d\n"
+    ),
+    STATUS_ZERO: (
+        ValueError,
+        "\tThere are zero-valued elements in %(name)s.\n"
+        "\tCheck the DLP instance for errors.\n"
+        "\tFirst offending index: %(index)d\n"
+    ),
+    STATUS_ABOVE_TWO_PI: (
+        ValueError,
+        "\tThere are values of %(label)s (radians)\n"
+        "\tthat are greater than 2pi. Check the DLP\n"
+        "\tinstance for errors. Also check to make sure\n"
+        "\tthe values in the DLP intance are in\n"
+        "\tradians, and NOT degrees.\n"
+        "\tFirst offending index: %(index)d\n"
+    )
+}
+
+
+def _validate_dlp_arrays(*arrs):
+    """
+        Purpose:
+            Run the error checks on the arrays retrieved from a
+            DLP instance. Valid input is the expected case, so
+            this only computes one reduction per check and leaves
+            the diagnostics to _dlp_error.
+        Arguments:
+            :arrs (*np.ndarray*):
+                The arrays rho_km_vals, p_norm_vals, phase_rad_vals,
+                B_rad_vals, D_km_vals, phi_rad_vals, f_sky_hz_vals,
+                and rho_dot_kms_vals, in the order of _DLP_CHECKS.
+        Outputs:
+            :status (*tuple*):
+                Tuple (code, field, index). code is STATUS_OK if all
+                of the arrays are valid. Otherwise it is the status
+                code of the first failed check, field is the index of
+                the offending array in _DLP_CHECKS, and index is the
+                first offending element (-1 if not applicable).
+    """
+    n_rho = np.size(arrs[0])
+    for field, (arr, (_, _, checks, tol)) in enumerate(zip(arrs, _DLP_CHECKS)):
+        for code in checks:
+            if (code == STATUS_NONREAL):
+                bad = np.iscomplexobj(arr) and np.any(np.imag(arr))
+            elif (code == STATUS_TOO_SHORT):
+                bad = (np.size(arr) < 2)
+            elif (code == STATUS_BAD_SIZE):
+                bad = (np.size(arr) != n_rho)
+            elif (code == STATUS_NEGATIVE):
+                bad = (np.min(np.real(arr)) < 0.0)
+            elif (code == STATUS_ZERO):
+                bad = not np.all(arr)
+            else:
+                bad = (np.max(np.abs(arr)) > TWO_PI+tol)
+
+            if bad:
+                return code, field, _first_offender(arr, code, tol)
+
+    return STATUS_OK, -1, -1
+
+
+def _first_offender(arr, code, tol):
+    """
+        Purpose:
+            Find the first element of an array that failed
+            one of the checks in _validate_dlp_arrays.
+        Arguments:
+            :arr (*np.ndarray*):
+                The array that failed the check.
+            :code (*int*):
+                Status code of the failed check.
+            :tol (*float*):
+                Tolerance used for the STATUS_ABOVE_TWO_PI check.
+        Outputs:
+            :index (*int*):
+                Index of the first offending element, or -1 if the
+                check does not concern individual elements.
+    """
+    if (code == STATUS_NONREAL):
+        offenders = np.imag(arr) != 0.0
+    elif (code == STATUS_NEGATIVE):
+        offenders = np.real(arr) < 0.0
+    elif (code == STATUS_ZERO):
+        offenders = (arr == 0)
+    elif (code == STATUS_ABOVE_TWO_PI):
+        offenders = np.abs(arr) > TWO_PI+tol
+    else:
+        return -1
+
+    return int(np.flatnonzero(offenders)[0])
+
+
+def _dlp_error(code, field, index):
+    """
+        Purpose:
+            Build the exception for a failed DLP array check.
+        Arguments:
+            :code (*int*):
+                Status code returned by _validate_dlp_arrays.
+            :field (*int*):
+                Index of the offending array in _DLP_CHECKS.
+            :index (*int*):
+                Index of the first offending element.
+        Outputs:
+            :err (*Exception*):
+                The exception to be raised, with a formatted message.
+    """
+    err_type, template = _DLP_ERRORS[code]
+    name, label = _DLP_CHECKS[field][:2]
+    return err_type(
+        "\n\tError Encountered:\n"
+        "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n" +
+        template % {"name": name, "label": label, "index": index}
+    )
+
+
+def _max_abs_rows(arr):
+    """
+        Purpose:
+            Compute the largest absolute value in each row of a
+            two dimensional array.
+        Arguments:
+            :arr (*np.ndarray*):
+                Two dimensional real array.
+        Outputs:
+            :max_abs (*np.ndarray*):
+                Largest absolute value in each row.
+    """
+    # For long rows, max(max(a), -min(a)) avoids the temporary |a|
+    # and is faster. For short rows the two reductions cost more.
+    if (np.shape(arr)[1] > MAX_ABS_ROW_SIZE):
+        return np.maximum(np.max(arr, axis=1), -np.min(arr, axis=1))
+    else:
+        return np.max(np.abs(arr), axis=1)
+
 
 class DiffractionCorrection(object):
     """
@@ -179,6 +394,13 @@ class DiffractionCorrection(object):
                 A Boolean for determining if various pieces of
                 information are printed to the screen or not.
                 Default is False.
+            :single_precision (*bool*):
+                A Boolean for determining whether or not the Fresnel
+                kernel is computed in single precision. psi is still
+                computed in double precision, and the sums over the
+                window are accumulated in double precision. This is
+                roughly twice as fast, with relative errors of about
+                1e-6 in the reconstruction. Default is False.
         Attributes:
             :bfac (*bool*):
                 Boolean for bfac (See keywords).
@@ -266,6 +488,8 @@ class DiffractionCorrection(object):
                 Requested range (See keywords).
             :sigma (*float*):
                 Requested Allen deviation (See keywords).
+            :single_precision (*bool*):
+                Boolean for single_precision (See keywords).
             :start (*int*):
                 First point that was reconstructed.
             :t_oet_spm_vals (*np.ndarray*):
@@ -291,7 +515,8 @@ class DiffractionCorrection(object):
     """
     def __init__(self, DLP, res, rng="all", wtype="kbmd20", fwd=False,
                  norm=True, verbose=False, bfac=True, sigma=2.e-13,
-                 psitype="fresnel4", write_file=False, res_factor=0.75):
+                 psitype="fresnel4", write_file=False, res_factor=0.75,
+                 single_precision=False):
 
         # Make sure that verbose is a boolean.
         if not isinstance(verbose, bool):
@@ -420,6 +645,20 @@ class DiffractionCorrection(object):
             )
         else:
             pass
+
+        # Check that single_precision boolean is valid.
+        if not isinstance(single_precision, bool):
+            raise TypeError(
+                "\n\tError Encountered:\n"
+                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
+                "\tsingle_precision must be Boolean: True/False\n"
+                "\tYour input has type: %s\n"
+                "\tInput should have type: bool\n"
+                "\tSet single_precision=True or single_precision=False\n"
+                % (type(single_precision).__name__)
+            )
+        else:
+            pass
         
         # Check that res_factor is a floating point number.
         if (not isinstance(res_factor, float)):
@@ -643,6 +882,7 @@ class DiffractionCorrection(object):
         self.bfac = bfac
         self.res = res*res_factor
         self.fwd = fwd
+        self.single_precision = single_precision
 
         # Retrieve variables from the DLP class, setting as attributes.
         if verbose:
@@ -689,250 +929,27 @@ class DiffractionCorrection(object):
                 "\tCheck your DLP class for errors." % erm
             )
 
-        n_rho = np.size(self.rho_km_vals)
-
-        # Run various error checks on all variables.
-        if not (np.all(np.isreal(self.rho_km_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\trho_km_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        elif (np.size(self.rho_km_vals) < 2):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\trho_km_vals has less than 2 points.\n"
-                "\tIt is impossible to do reconstruction.\n"
-                "\tPlease check your input data.\n"
-            )
-        elif (np.min(self.rho_km_vals < 0)):
-                raise ValueError(
-                    "\n\tError Encountered:\n"
-                    "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                    "\trho_km_vals has negative values.\n"
-                    "\tPlease check your DLP class for errors."
-                )
-        else:
-            self.rho_km_vals = self.rho_km_vals.astype(float)
-
-        if (np.size(self.p_norm_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(power) != len(rho)\n"
-                "\tThe number of data points in power is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif (np.min(self.p_norm_vals) < 0.0):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are negative values in the\n"
-                "\tnormalized diffracted power. Check\n"
-                "\tthe DLP instance for errors.")
-        elif not (np.all(np.isreal(self.p_norm_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tp_norm_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        else:
-            self.p_norm_vals = self.p_norm_vals.astype(float)
-
-        if (np.size(self.phase_rad_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(phase) != len(rho)\n"
-                "\tThe number of data points in phase is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif not (np.all(np.isreal(self.phase_rad_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tphase_rad_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        elif (np.max(np.abs(self.phase_rad_vals)) > TWO_PI+1e-8):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are values of phase (radians)\n"
-                "\tthat are greater than 2pi. Check the DLP\n"
-                "\tinstance for errors. Also check to make sure\n"
-                "\tthe values in the DLP intance are in\n"
-                "\tradians, and NOT degrees.\n"
-            )
-        else:
-            # Negating phase from mathematical conventions.
-            self.phase_rad_vals = -self.phase_rad_vals.astype(float)
-
-        if (np.size(self.B_rad_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(B) != len(rho)\n"
-                "\tThe number of data points in B is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif (np.max(np.abs(self.B_rad_vals)) > TWO_PI+1e-8):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are values of B (radians)\n"
-                "\tthat are greater than 2pi. Check the DLP\n"
-                "\tinstance for errors. Also check to make sure\n"
-                "\tthe values in the DLP intance are in\n"
-                "\tradians, and NOT degrees.\n"
-            )
-        elif not (np.all(np.isreal(self.B_rad_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tB_rad_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        else:
-            self.B_rad_vals = self.B_rad_vals.astype(float)
-
-        if (np.size(self.D_km_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(D) != len(rho)\n"
-                "\tThe number of data points in D is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif not (np.all(np.isreal(self.D_km_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tD_km_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        elif (np.min(self.D_km_vals) < 0.0):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are negative values for the\n"
-                "\tspacecraft to RIP distance, D.\n"
-                "\tCheck the DLP instance for errors.\n"
-            )
-        elif (np.min(self.D_km_vals == 0.0)):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are zero-valued elements for the\n"
-                "\tSpacecraft to Ring-Intercept-Point distance, D.\n"
-                "\Check the DLP instance for errors.\n"
-            )
-        else:
-            self.D_km_vals = self.D_km_vals.astype(float)
-
-        if (np.size(self.phi_rad_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(phi) != len(rho)\n"
-                "\tThe number of data points in angle is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif not (np.all(np.isreal(self.phi_rad_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tphi_rad_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        elif (np.max(np.abs(self.phi_rad_vals)) > TWO_PI+1e-6):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are values of phi (in radians)\n"
-                "\tthat are greater than 2pi. Check the DLP\n"
-                "\tinstance for errors. Also check to make sure\n"
-                "\tthe values in the DLP intance are in\n"
-                "\tradians, and NOT degrees.\n"
-            )
-        else:
-            self.phi_rad_vals = self.phi_rad_vals.astype(float)
-
-        if (np.size(self.f_sky_hz_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(frequency) != len(rho)\n"
-                "\tThe number of data points in frequency is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif not (np.all(np.isreal(self.f_sky_hz_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tf_sky_hz_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
-        elif (np.min(self.f_sky_hz_vals < 0.0)):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are negative values of the frequency.\n"
-                "\tCheck the DLP instance for errors.\n"
-            )
-        elif (np.min(self.f_sky_hz_vals == 0.0)):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tThere are zero-valued elements for the\n"
-                "\tfrequency. Check the DLP instance for errors."
-            )
-        else:
-            self.f_sky_hz_vals = self.f_sky_hz_vals.astype(float)
+        # Run every error check on the DLP arrays in a single pass.
+        status = _validate_dlp_arrays(
+            self.rho_km_vals, self.p_norm_vals, self.phase_rad_vals,
+            self.B_rad_vals, self.D_km_vals, self.phi_rad_vals,
+            self.f_sky_hz_vals, self.rho_dot_kms_vals
+        )
 
-        if (np.size(self.rho_dot_kms_vals) != n_rho):
-            raise IndexError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\tBad DLP: len(rho_dot) != len(rho)\n"
-                "\tThe number of data points in velocity is\n"
-                "\tnot equal to the number of data points\n"
-                "\tin radius. Check the input DLP\n"
-                "\tinstance for any errors.\n"
-            )
-        elif not (np.all(np.isreal(self.rho_dot_kms_vals))):
-            raise ValueError(
-                "\n\tError Encountered:\n"
-                "\t\trss_ringoccs.diffrec.DiffractionCorrection\n\n"
-                "\trho_dot_kms_vals is not an array of real\n"
-                "\tvalued floating point numbers. Please\n"
-                "\tcheck your DLP class for errors.\n"
-            )
+        if (status[0] != STATUS_OK):
+            raise _dlp_error(*status)
         else:
-            self.rho_dot_kms_vals = self.rho_dot_kms_vals.astype(float)
-            del n_rho, erm
+            del status, erm
+
+        # Negating phase from mathematical conventions.
+        self.rho_km_vals = self.rho_km_vals.astype(float)
+        self.p_norm_vals = self.p_norm_vals.astype(float)
+        self.phase_rad_vals = -self.phase_rad_vals.astype(float)
+        self.B_rad_vals = self.B_rad_vals.astype(float)
+        self.D_km_vals = self.D_km_vals.astype(float)
+        self.phi_rad_vals = self.phi_rad_vals.astype(float)
+        self.f_sky_hz_vals = self.f_sky_hz_vals.astype(float)
+        self.rho_dot_kms_vals = self.rho_dot_kms_vals.astype(float)
 
         # Compute sampling distance (km)
         self.dx_km = self.rho_km_vals[1] - self.rho_km_vals[0]
@@ -1209,7 +1226,8 @@ class DiffractionCorrection(object):
             'bfac': bfac,
             'sigma': sigma,
             'psitype': psitype,
-            'res_factor': res_factor
+            'res_factor': res_factor,
+            'single_precision': single_precision
         }
 
         # Delete unnecessary variables for clarity.
@@ -1272,202 +1290,109 @@ class DiffractionCorrection(object):
         if self.verbose:
             print("\tDiffraction Correction Complete.")
 
-    def __rect(w_in, dx):
+    def __rect(x):
         """
             Purpose:
                 Compute the rectangular window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
+        return np.ones(np.size(x))
 
-        # Compute window function
-        w_func = np.zeros(nw_pts) + 1.0
-        return w_func
-
-    def __coss(w_in, dx):
+    def __coss(x):
         """
             Purpose:
                 Compute the squared cosine window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = ONE_PI*(np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
+        return np.cos(ONE_PI*x)*np.cos(ONE_PI*x)
 
-        # Compute window function.
-        w_func = np.cos(x)*np.cos(x)
-        return w_func
-
-    def __kb20(w_in, dx):
+    def __kb20(x):
         """
             Purpose:
                 Compute the Kaiser-Bessel 2.0 window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = (np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
+        return i0(TWO_PI * np.sqrt((1.0 - 4.0*x*x))) / IV0_20
 
-        # Compute window function.
-        w_func = iv(0.0, TWO_PI * np.sqrt((1.0 - 4.0*x*x))) / IV0_20
-        return w_func
-
-    def __kb25(w_in, dx):
+    def __kb25(x):
         """
             Purpose:
                 Compute the Kaiser-Bessel 2.5 window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = (np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
-
         # Alpha value for kb25 is 2.5.
         alpha = 2.5 * ONE_PI
+        return i0(alpha * np.sqrt((1.0 - 4.0*x*x))) / IV0_25
 
-        # Compute window function.
-        w_func = iv(0.0, alpha * np.sqrt((1.0 - 4.0*x*x))) / IV0_25
-        return w_func
-
-    def __kb35(w_in, dx):
+    def __kb35(x):
         """
             Purpose:
                 Compute the Kaiser-Bessel 3.5 window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = (np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
-
         # Alpha value for kb35 is 3.5.
         alpha = 3.5 * ONE_PI
+        return i0(alpha * np.sqrt((1.0 - 4.0*x*x))) / IV0_35
 
-        # Compute window function.
-        w_func = iv(0.0, alpha * np.sqrt((1.0 - 4.0*x*x))) / IV0_35
-        return w_func
-
-    def __kbmd20(w_in, dx):
+    def __kbmd20(x):
         """
             Purpose:
-                Compute the Modifed Kaiser-Bessel 2.0
-                window function.
+                Compute the Modifed Kaiser-Bessel 2.0 window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = (np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
+        return (i0(TWO_PI*np.sqrt(1.0 - 4.0*x*x)) - 1.0)/(IV0_20 - 1.0)
 
-        # Compute window function.
-        w_func = (iv(0.0, TWO_PI*np.sqrt(1.0 - 4.0*x*x)) - 1.0)/(IV0_20 - 1.0)
-        return w_func
-
-    def __kbmd25(w_in, dx):
+    def __kbmd25(x):
         """
             Purpose:
-                Compute the Modifed Kaiser-Bessel 2.5
-                window function.
+                Compute the Modifed Kaiser-Bessel 2.5 window function.
             Arguments:
-                :w_in (*float*):
-                    The width of the window function to be computed.
-                    This value is in kilometers.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
+                :x (*np.ndarray*):
+                    Position within the window, as a fraction of
+                    the window width. Values lie in [-0.5, 0.5].
             Outputs:
                 :w_func (*np.ndarray*):
-                    Window function of width
-                    w_in and with sample spacing dx.
+                    Window function evaluated at x.
         """
-        # Window functions have an odd number of points.
-        nw_pts = int(2 * np.floor(w_in / (2.0 * dx)) + 1)
-
-        # Compute argument of window function.
-        x = (np.arange(nw_pts) - ((nw_pts - 1) / 2.0)) * dx / w_in
-
         # Alpha value for kbmd25 is 2.5.
         alpha = 2.5 * ONE_PI
-
-        # Compute window function.
-        w_func = (iv(0.0, alpha*np.sqrt(1.0 - 4.0*x*x)) - 1.0) / (IV0_25 - 1.0)
-        return w_func
+        return (i0(alpha*np.sqrt(1.0 - 4.0*x*x)) - 1.0) / (IV0_25 - 1.0)
 
     # Function dictionary with normalized equivalent widths.
     __func_dict = {
@@ -1488,8 +1413,8 @@ class DiffractionCorrection(object):
             Purpose:
                 Trim the attributes in the DiffractionCorrection
                 class so that only reconstructed points will be
-                returned to the user. All other unused points are
-                discarded.
+                returned to the user. The trimmed attributes are
+                views into the untrimmed arrays.
             Keywords:
                 :fwd (*bool*):
                     Boolean for the forward calculation.
@@ -1497,9 +1422,10 @@ class DiffractionCorrection(object):
                     will also be trimmed.
         """
         # Get rid of uncomputed values and keep only what was processed.
+        # The points are contiguous, so a slice gives views, not copies.
         start = self.start
         n_used = self.n_used
-        crange = np.arange(n_used)+start
+        crange = slice(start, start+n_used)
 
         # Ring radius, azimuth angle, diffracted power, and phase.
         self.rho_km_vals = self.rho_km_vals[crange]
@@ -1547,151 +1473,654 @@ class DiffractionCorrection(object):
             self.T_hat_fwd_vals = self.T_hat_fwd_vals[crange]
             self.phase_fwd_vals = self.phase_fwd_vals[crange]
 
-    def __normalize(self, dx, ker, f_scale):
+    def __psi_fixed(self, kD, r, r0, phi0, B, D):
         """
             Purpose:
-                Compute the window normalization
+                Compute the terms of psi that do not depend on phi.
+                These are computed once and reused for every step
+                of Newton-Raphson. The terms are packed into a single
+                array, one contiguous plane per term, so the points
+                still iterating are gathered with one np.take. The
+                per-point terms are broadcast across the window, which
+                keeps every plane contiguous for the ufuncs.
             Arguments:
-                :ker (*np.ndarray*):
-                    The Fresnel Kernel.
-                :dx (*float*):
-                    The spacing between points in the window.
-                    This is equivalent to the sample spacing.
-                    This value is in kilometers.
-                :f_scale (*np.ndarray*):
-                    The Fresnel Scale in kilometers.
-            Outputs:
-                :norm_fact (*float*):
-                    The normalization of the input
-                    Fresnel Kernel.
-        """
-        # Freespace Integral
-        T1 = np.abs(np.sum(ker) * dx)
-
-        # Normalization Factor
-        norm_fact = SQRT_2 * f_scale / T1
-        return norm_fact
-
-    def __psi_func(self, kD, r, r0, phi, phi0, B, D):
-        """
-            Purpose:
-                Compute psi (MTR Equation 4)
-            Arguments:
-                :kD (*float*):
+                :kD (*np.ndarray*):
                     Wavenumber, unitless.
-                :r (*float*):
+                :r (*np.ndarray*):
                     Radius of reconstructed point, in kilometers.
                 :r0 (*np.ndarray*):
                     Radius of region within window, in kilometers.
-                :phi (*np.ndarray*):
-                    Root values of dpsi/dphi, radians.
                 :phi0 (*np.ndarray*):
                     Ring azimuth angle corresponding to r0, radians.
-                :B (*float*):
+                :B (*np.ndarray*):
                     Ring opening angle, in radians.
-                :D (*float*):
+                :D (*np.ndarray*):
                     Spacecraft-RIP distance, in kilometers.
+            Outputs:
+                :fixed (*np.ndarray*):
+                    Array of shape (8, points, window) holding r,
+                    phi0, cos(B)/D, D^2, kD, 2 r r0, r0^2 + r^2,
+                    and r0 cos(phi0), in that order.
+        """
+        fixed = np.empty((8,) + np.shape(r0))
+        r_f, phi0_f, cB_D, D2, kD_f, rr0, r_sq, r0_cos = fixed
+        r_f[...] = r
+        phi0_f[...] = phi0
+        cB_D[...] = np.cos(B)/D
+        D2[...] = D*D
+        kD_f[...] = kD
+        np.multiply(2.0*r, r0, out=rr0)
+        np.multiply(r0, r0, out=r_sq)
+        r_sq += r*r
+        np.multiply(r0, np.cos(phi0), out=r0_cos)
+        return fixed
+
+    def __psi_and_derivs(self, phi, fixed):
+        """
+            Purpose:
+                Compute psi (MTR Equation 4) together with its first
+                and second partial derivatives with respect to phi.
+                The trig terms and square root are evaluated once and
+                shared between all three outputs.
+            Arguments:
+                :phi (*np.ndarray*):
+                    Root values of dpsi/dphi, radians.
+                :fixed (*np.ndarray*):
+                    The terms returned by __psi_fixed.
             Outputs:
                 :psi (*np.ndarray*):
                     Geometric Function from Fresnel Kernel.
+                :dpsi (*np.ndarray*):
+                    Partial derivative of psi with
+                    respect to phi.
+                :d2psi (*np.ndarray*):
+                    Second partial derivative of psi
+                    with respect to phi.
         """
+        # The fixed terms are only read. Each array computed below is
+        # reused in place once its value is no longer needed.
+        r, phi0, cB_D, D2, kD, rr0, r_sq, r0_cos = fixed
+
+        # Shared trig terms.
+        cphi = np.cos(phi)
+        sphi = np.sin(phi)
+        dphi = phi-phi0
+        cd = np.cos(dphi)
+        sd = np.sin(dphi, out=dphi)
+
         # Compute Xi variable (MTR86 Equation 4b). Signs of xi are swapped.
-        xi = (np.cos(B)/D) * (r * np.cos(phi) - r0 * np.cos(phi0))
+        xi = r*cphi
+        xi -= r0_cos
+        xi *= cB_D
 
         # Compute Eta variable (MTR86 Equation 4c).
-        eta = (r0*r0 + r*r - 2.0*r*r0*np.cos(phi-phi0)) / (D*D)
+        rr0_cd = np.multiply(rr0, cd, out=cd)
+        eta = r_sq - rr0_cd
+        eta /= D2
+
+        # psi0 = sqrt(1 + eta - 2 xi), computed in the eta array.
+        eta += 1.0
+        eta -= 2.0*xi
+        psi0 = np.sqrt(eta, out=eta)
 
         # Sign of xi swapped from MTR86.
-        psi_vals = kD * (np.sqrt(1.0+eta-2.0*xi) + xi - 1.0)
+        psi_vals = psi0 + xi
+        psi_vals -= 1.0
+        psi_vals *= kD
+
+        # Compute derivatives of xi and eta.
+        dxi = np.multiply(r, sphi, out=sphi)
+        dxi *= -cB_D
+        dxi2 = np.multiply(r, cphi, out=cphi)
+        dxi2 *= -cB_D
+        deta = np.multiply(rr0, sd, out=sd)
+        deta /= D2
+        deta2 = rr0_cd
+        deta2 /= D2
+
+        # Compute the first and second partial derivatives.
+        u = deta
+        u -= 2.0*dxi
+        h = 0.5/psi0
+
+        psi_d1 = h*u
+        psi_d1 += dxi
+        psi_d1 *= kD
+
+        psi_d2 = psi0*psi0
+        psi_d2 *= psi0
+        np.divide(-0.25, psi_d2, out=psi_d2)
+        psi_d2 *= u
+        psi_d2 *= u
+        deta2 -= 2.0*dxi2
+        deta2 *= h
+        deta2 += dxi2
+        psi_d2 += deta2
+        psi_d2 *= kD
+
+        return psi_vals, psi_d1, psi_d2
+
+    def __window_runs(self, start, n_used):
+        """
+            Purpose:
+                Split the points being computed into runs of
+                consecutive points that share a window function.
+                The window function is only recomputed once the
+                window width has drifted by two sample spacings.
+            Arguments:
+                :start (*int*):
+                    Index of the first point being computed.
+                :n_used (*int*):
+                    Number of points being computed.
+            Outputs:
+                :runs (*list*):
+                    List of tuples (first, last, w). The points
+                    first, ..., last-1 all use the window function
+                    of width w (in kilometers).
+        """
+        runs = []
+        if (n_used < 1):
+            return runs
+
+        w_vals = self.w_km_vals[start:start+n_used]
+        w_tol = 2.0 * self.dx_km
+        first = 0
+        while (first < n_used):
+            w_init = float(w_vals[first])
+
+            # Search ahead in doubling steps for the first point whose
+            # width has drifted from w_init, rather than point by point.
+            last = first+1
+            step = 64
+            while (last < n_used):
+                drift = np.abs(w_init - w_vals[last:last+step]) >= w_tol
+                if np.any(drift):
+                    last += int(np.argmax(drift))
+                    break
+
+                last += step
+                step *= 2
+
+            last = min(last, n_used)
+            runs.append((start+first, start+last, w_init))
+            first = last
+
+        return runs
+
+    def __precompute_geom(self, start, n_pts, n_max):
+        """
+            Purpose:
+                Compute the geometric quantities used by the Fresnel
+                approximations to psi over a range of points.
+            Arguments:
+                :start (*int*):
+                    Index of the first point.
+                :n_pts (*int*):
+                    Number of points.
+                :n_max (*int*):
+                    Highest degree of Legendre polynomial needed.
+            Outputs:
+                :A_2 (*np.ndarray*):
+                    The coefficient A_2 at each point.
+                :P (*list*):
+                    The Legendre polynomials P_0, ..., P_n_max
+                    evaluated at cos(B)cos(phi) for each point.
+        """
+        crange = slice(start, start+n_pts)
+        cosb = np.cos(self.B_rad_vals[crange])
+        cosp = np.cos(self.phi_rad_vals[crange])
+        sinp = np.sin(self.phi_rad_vals[crange])
+        A_2 = 0.5*cosb*cosb*sinp*sinp/(1.0-cosb*cosb*sinp*sinp)
+
+        # Legendre polynomials from Bonnet's recursion formula,
+        # n P_n = (2n-1) x P_(n-1) - (n-1) P_(n-2).
+        P_1 = cosb*cosp
+        P = [np.ones(n_pts), P_1]
+        for n in range(2, n_max+1):
+            P.append(((2*n-1)*P_1*P[n-1] - (n-1)*P[n-2])/n)
+
+        return A_2, P
+
+    # Number of terms in the series for psi for each Fresnel approximation.
+    __psi_terms = {"fresnel3": 2, "fresnel4": 3, "fresnel6": 5, "fresnel8": 7}
+
+    def __psi_coeffs(self, kD_vals, start, n_used):
+        """
+            Purpose:
+                Compute the per-point coefficients of the Fresnel
+                approximation to psi selected by psitype. The series
+                in z = x/D is rewritten as a polynomial in x, so the
+                coefficients are computed once for every point and
+                psi is a matrix product over each block of points.
+            Arguments:
+                :kD_vals (*np.ndarray*):
+                    Product of the wavenumber and RIP distance.
+                :start (*int*):
+                    Index of the first point being computed.
+                :n_used (*int*):
+                    Number of points being computed.
+            Outputs:
+                :coeffs (*dict*):
+                    Dictionary of the arrays used by __psi_block.
+                    coeffs["b"] has one row per point, and column k
+                    is the coefficient of x^(k+2).
+        """
+        crange = slice(start, start+n_used)
+        if (self.psitype == "fresnel"):
+            F = self.F_km_vals[crange]
+            return {"b": (HALF_PI/(F*F))[:, None], "C": None}
+
+        # fresnel6 and fresnel8 evaluate A_2 across the window, so the
+        # geometry is needed half a window beyond the computed points.
+        # Every window lies inside the data, so the padded range is
+        # clipped to the ends of the arrays.
+        if (self.psitype == "fresnel6") or (self.psitype == "fresnel8"):
+            w_max = np.max(self.w_km_vals[crange])
+            pad = int(np.floor(w_max / (2.0 * self.dx_km)))
+        else:
+            pad = 0
+
+        lo = max(start-pad, 0)
+        hi = min(start+n_used+pad, np.size(self.rho_km_vals))
+        n_terms = self.__psi_terms[self.psitype]
+        A_2, P = self.__precompute_geom(lo, hi-lo, n_terms+1)
+        P = [P_k[start-lo:start-lo+n_used] for P_k in P]
+
+        # Second set of polynomials, b_k = (P_k - P_1 P_(k+1)) / (k+2).
+        b = [(P[k]-P[1]*P[k+1])/(k+2) for k in range(n_terms)]
+
+        # Products of Legendre Polynomials used in Expansion. C_k is the
+        # coefficient of z^k in (P_1 + P_2 z + ... + P_m z^(m-1))^2.
+        m = n_terms//2 + 1
+        C = []
+        for k in range(n_terms):
+            C_k = 0.0
+            for i in range(max(0, k-m+1), min(k, m-1)+1):
+                C_k = C_k + P[i+1]*P[k-i+1]
+            C.append(C_k)
+
+        # Scale factors kD/D^(k+2) convert each term in z to one in x.
+        d = self.D_km_vals[crange]
+        scale = kD_vals[crange]/(d*d)
+        b_x = np.empty((n_used, len(b)))
+        C_x = np.empty((n_used, len(C)))
+        for k in range(len(b)):
+            b_x[:, k] = b[k]*scale
+            C_x[:, k] = C[k]*scale
+            scale = scale/d
+
+        if (pad > 0):
+            return {"b": b_x, "C": C_x, "A_2": A_2, "A_2_start": lo}
+        else:
+            return {"b": b_x - A_2[:, None]*C_x, "C": None}
+
+    def __psi_block(self, coeffs, rows, crange, x):
+        """
+            Purpose:
+                Compute the Fresnel approximation to psi for a
+                block of points sharing the same window function.
+            Arguments:
+                :coeffs (*dict*):
+                    Coefficients returned by __psi_coeffs.
+                :rows (*slice*):
+                    Rows of the coefficient arrays for the points
+                    being computed.
+                :crange (*slice*):
+                    Index of the first point in the window about
+                    each point being computed.
+                :x (*np.ndarray*):
+                    Radial distance from the center of the window
+                    to each point in the window, in kilometers.
+            Outputs:
+                :psi_vals (*np.ndarray*):
+                    Two dimensional array of psi, one row per point.
+        """
+        # Powers x^2, x^3, ... of the radial parameter, one per row.
+        n_terms = np.shape(coeffs["b"])[1]
+        x_pow = x ** np.arange(2, n_terms+2)[:, None]
+
+        psi_vals = np.dot(coeffs["b"][rows], x_pow)
+        if coeffs["C"] is not None:
+            # A_2 is stored from index A_2_start onwards.
+            lo = coeffs["A_2_start"]
+            A_2 = sliding_window_view(coeffs["A_2"], np.size(x))[
+                crange.start-lo:crange.stop-lo]
+            psi_vals -= A_2*np.dot(coeffs["C"][rows], x_pow)
+
         return psi_vals
 
-    def __dpsi(self, kD, r, r0, phi, phi0, B, D):
+    def __window_table(self, w_vals, fwd):
         """
             Purpose:
-                Compute dpsi/dphi
+                Compute the window functions for a set of window
+                widths. Each window is evaluated at its own width,
+                and all of the windows are computed with a single
+                call to the window function.
+
+                Each window is stored as the weights of the real and
+                imaginary parts of the Fresnel kernel, in the precision
+                of the kernel, so that the direction of the transform
+                and the precision are fixed once per transform.
             Arguments:
-                :kD (*float*):
-                    Wavenumber, unitless.
-                :r (*float*):
-                    Radius of reconstructed point, in kilometers.
-                :r0 (*np.ndarray*):
-                    Radius of region within window, in kilometers.
-                :phi (*np.ndarray*):
-                    Root values of dpsi/dphi, radians.
-                :phi0 (*np.ndarray*):
-                    Ring azimuth angle corresponding to r0, radians.
-                :B (*float*):
-                    Ring opening angle, in radians.
-                :D (*float*):
-                    Spacecraft-RIP distance, in kilometers.
+                :w_vals (*list*):
+                    Window widths, in kilometers.
+                :fwd (*bool*):
+                    Boolean for the forward calculation.
             Outputs:
-                :dpsi (*array*):
-                    Partial derivative of psi with
-                    respect to phi.
+                :w_cache (*dict*):
+                    Windows keyed by their width. Each window is a
+                    (2, nw_pts) array, with rows w and w (forward)
+                    or -w (inverse).
         """
-        # Compute Xi variable (MTR86 Equation 4b).
-        xi = (np.cos(B)/D) * (r * np.cos(phi) - r0 * np.cos(phi0))
+        w_list = sorted(set(w_vals))
+        if (len(w_list) == 0):
+            return {}
 
-        # Compute Eta variable (MTR86 Equation 4c).
-        eta = (r0*r0 + r*r - 2.0*r*r0*np.cos(phi-phi0)) / (D*D)
+        # Window functions have an odd number of points.
+        nw_list = [int(2 * np.floor(w / (2.0 * self.dx_km)) + 1)
+                   for w in w_list]
 
-        psi0 = np.sqrt(1.0+eta-2.0*xi)
+        # Position of each point as a fraction of the window width.
+        x = np.concatenate([
+            (np.arange(nw) - ((nw - 1) / 2.0)) * self.dx_km / w
+            for (nw, w) in zip(nw_list, w_list)
+        ])
 
-        # Compute derivatives.
-        dxi = -(np.cos(B)/D) * (r*np.sin(phi))
-        deta = 2.0*r*r0*np.sin(phi-phi0)/(D*D)
+        fw = self.__func_dict[self.wtype]["func"]
+        w_all = fw(x)
 
-        # Compute the partial derivative.
-        psi_d1 = (0.5/psi0)*(deta-2.0*dxi) + dxi
-        psi_d1 *= kD
+        if self.single_precision:
+            w_ker = np.empty((2, np.size(x)), dtype=np.float32)
+        else:
+            w_ker = np.empty((2, np.size(x)))
 
-        return psi_d1
+        # The sign of the imaginary part selects the direction.
+        sign = 1.0 if fwd else -1.0
+        w_ker[0] = w_all
+        w_ker[1] = sign*w_all
 
-    def __d2psi(self, kD, r, r0, phi, phi0, B, D):
+        w_ker = np.split(w_ker, np.cumsum(nw_list)[:-1], axis=1)
+        return dict(zip(w_list, w_ker))
+
+    def __window(self, w, w_cache, fwd):
         """
             Purpose:
-                Compute d^2psi/dphi^2
+                Return the kernel window for a window of width w,
+                computing it and adding it to w_cache if needed.
             Arguments:
-                :kD (*float*):
-                    Wavenumber, unitless.
-                :r (*float*):
-                    Radius of reconstructed point, in kilometers.
-                :r0 (*np.ndarray*):
-                    Radius of region within window, in kilometers.
-                :phi (*np.ndarray*):
-                    Root values of dpsi/dphi, radians.
-                :phi0 (*np.ndarray*):
-                    Ring azimuth angle corresponding to r0, radians.
-                :B (*float*):
-                    Ring opening angle, in radians.
-                :D (*float*):
-                    Spacecraft-RIP distance, in kilometers.
+                :w (*float*):
+                    Width of the window, in kilometers.
+                :w_cache (*dict*):
+                    Windows keyed by their width.
+                :fwd (*bool*):
+                    Boolean for the forward calculation.
             Outputs:
-                :dpsi (*np.ndarray*):
-                    Second partial derivative of psi
-                    with respect to phi.
+                :w_ker (*np.ndarray*):
+                    The kernel window (see __window_table).
         """
-        # Compute Xi variable (MTR86 Equation 4b).
-        xi = (np.cos(B)/D) * (r * np.cos(phi) - r0 * np.cos(phi0))
+        if w not in w_cache:
+            w_cache.update(self.__window_table([w], fwd))
 
-        # Compute Eta variable (MTR86 Equation 4c).
-        eta = (r0*r0 + r*r - 2.0*r*r0*np.cos(phi-phi0)) / (D*D)
+        return w_cache[w]
 
-        psi0 = np.sqrt(1.0+eta-2.0*xi)
+    def __kernel(self, w_ker, psi_vals):
+        """
+            Purpose:
+                Compute the windowed Fresnel kernel w*exp(+/-i psi).
+                The real and imaginary parts are written directly
+                from cos(psi) and sin(psi), which avoids the complex
+                temporary and the complex exponential of np.exp.
+                The kernel has the precision of w_ker.
+            Arguments:
+                :w_ker (*np.ndarray*):
+                    The kernel window returned by __window.
+                :psi_vals (*np.ndarray*):
+                    Values of psi over the window.
+            Outputs:
+                :ker (*np.ndarray*):
+                    The complex Fresnel kernel.
+        """
+        psi_vals = psi_vals.astype(w_ker.dtype, copy=False)
+        ker = np.empty(np.shape(psi_vals),
+                       dtype=np.promote_types(w_ker.dtype, np.complex64))
+
+        # cos(psi) and sin(psi) share one scratch array.
+        trig = np.cos(psi_vals)
+        np.multiply(trig, w_ker[0], out=ker.real)
+        np.sin(psi_vals, out=trig)
+        np.multiply(trig, w_ker[1], out=ker.imag)
+        return ker
+
+    def __kernel_sums(self, w_ker, psi_vals, T):
+        """
+            Purpose:
+                Compute the windowed Fresnel kernel for a block of
+                points and sum it against the data in each window.
+                einsum forms the row-wise products and sums without a
+                temporary array, and the sum of the kernel itself is
+                only computed when it is needed for normalization.
+            Arguments:
+                :w_ker (*np.ndarray*):
+                    The kernel window returned by __window.
+                :psi_vals (*np.ndarray*):
+                    Values of psi, one row per point.
+                :T (*np.ndarray*):
+                    Data inside the window of each point, one
+                    row per point.
+            Outputs:
+                :T_sum (*np.ndarray*):
+                    Sum of the kernel times the data for each point.
+                :ker_sum (*np.ndarray*):
+                    Sum of the kernel for each point, or None if
+                    normalization has not been set.
+        """
+        ker = self.__kernel(w_ker, psi_vals)
+        T_sum = np.einsum("ij,ij->i", ker, T, dtype=complex)
+        if self.norm:
+            # Row sums as a matrix-vector product with a vector of ones.
+            ker_sum = np.dot(ker, np.ones(np.shape(ker)[-1], dtype=complex))
+        else:
+            ker_sum = None
 
-        # Compute derivatives.
-        dxi = -(np.cos(B)/D) * (r*np.sin(phi))
-        dxi2 = -(np.cos(B)/D) * (r*np.cos(phi))
+        return T_sum, ker_sum
 
-        deta = 2.0*r*r0*np.sin(phi-phi0)/(D*D)
-        deta2 = 2.0*r*r0*np.cos(phi-phi0)/(D*D)
+    def __same_kernel(self, coeffs, first, last):
+        """
+            Purpose:
+                Determine whether a block of points all have the
+                same Fresnel kernel. This is the case if the psi
+                coefficients are constant across the block, and A_2
+                is not evaluated across the window.
+            Arguments:
+                :coeffs (*dict*):
+                    Coefficients returned by __psi_coeffs.
+                :first (*int*):
+                    First row of the coefficients in the block.
+                :last (*int*):
+                    One past the last row of the coefficients.
+            Outputs:
+                :same (*bool*):
+                    True if every point has the same kernel.
+        """
+        if coeffs["C"] is not None:
+            return False
 
-        # Compute the second partial derivative.
-        psi_d2 = (-0.25/(psi0*psi0*psi0))*(deta-2.0*dxi)*(deta-2.0*dxi)
-        psi_d2 += (0.5/psi0)*(deta2-2.0*dxi2)+dxi2
-        psi_d2 *= kD
+        b = coeffs["b"][first:last]
+        return bool(np.all(np.ptp(b, axis=0) <= FFT_KERNEL_RTOL*np.abs(b[0])))
 
-        return psi_d2
+    def __fresnel_block(self, T_in, T_out, coeffs, w_ker, x, blk, end,
+                        start):
+        """
+            Purpose:
+                Compute the inversion (or forward model) for a block
+                of consecutive points sharing a window function, using
+                a Fresnel approximation to psi.
+            Arguments:
+                :T_in (*np.ndarray*):
+                    Complex transmittance being transformed.
+                :T_out (*np.ndarray*):
+                    Complex transmittance being computed. The points
+                    blk, ..., end-1 are written to.
+                :coeffs (*dict*):
+                    Coefficients returned by __psi_coeffs.
+                :w_ker (*np.ndarray*):
+                    The kernel window returned by __window.
+                :x (*np.ndarray*):
+                    Radial distance from the center of the window
+                    to each point in the window, in kilometers.
+                :blk (*int*):
+                    Index of the first point in the block.
+                :end (*int*):
+                    One past the index of the last point in the block.
+                :start (*int*):
+                    Index of the first point of the transform.
+        """
+        nw = np.shape(w_ker)[1]
+        half = (nw-1)//2
+
+        # Current points being computed and their windows.
+        center = slice(blk, end)
+        crange = slice(blk-half, end-half)
+        F = self.F_km_vals[center]
+
+        # If the kernel is the same for every point in the block, the
+        # inversion is a correlation and is done with FFTs.
+        if (end-blk > nw) and self.__same_kernel(coeffs, blk-start,
+                                                 end-start):
+            psi_vals = self.__psi_block(
+                coeffs, slice(blk-start, blk-start+1), crange, x
+            )[0]
+            ker = self.__kernel(w_ker, psi_vals)
+            T_sum = fftconvolve(T_in[blk-half:end+half], ker[::-1],
+                                mode="valid")
+
+            # The kernel, and so its normalization, is shared by the
+            # whole block and is only summed once.
+            if self.norm:
+                ker_sum = np.sum(ker, dtype=complex)
+        else:
+            # Compute psi and the Fresnel kernel for every point.
+            psi_vals = self.__psi_block(
+                coeffs, slice(blk-start, end-start), crange, x
+            )
+
+            # Range of diffracted data inside each window.
+            T = sliding_window_view(T_in, nw)[crange]
+            T_sum, ker_sum = self.__kernel_sums(w_ker, psi_vals, T)
+
+        # Scale factor of the 'approximate' Fresnel Inversion.
+        scale = self.dx_km*(1.0+1.0j)/(2.0*F)
+
+        # If normalization has been set, divide by the
+        # freespace integral of the kernel.
+        if self.norm:
+            scale *= SQRT_2*F/np.abs(ker_sum*self.dx_km)
+
+        # Compute 'approximate' Fresnel Inversion for the block.
+        T_out[center] = T_sum*scale
+
+    def __full_block(self, T_in, T_out, kD_vals, w_ker, blk, end):
+        """
+            Purpose:
+                Compute the inversion (or forward model) for a block
+                of consecutive points sharing a window function, using
+                the full psi function. The stationary azimuth angle is
+                found with Newton-Raphson for every point at once, with
+                each point keeping its own iteration count.
+            Arguments:
+                :T_in (*np.ndarray*):
+                    Complex transmittance being transformed.
+                :T_out (*np.ndarray*):
+                    Complex transmittance being computed. The points
+                    blk, ..., end-1 are written to.
+                :kD_vals (*np.ndarray*):
+                    Product of the wavenumber and RIP distance.
+                :w_ker (*np.ndarray*):
+                    The kernel window returned by __window.
+                :blk (*int*):
+                    Index of the first point in the block.
+                :end (*int*):
+                    One past the index of the last point in the block.
+            Outputs:
+                :loop (*int*):
+                    Largest number of Newton-Raphson iterations
+                    used by a point in the block.
+        """
+        nw = np.shape(w_ker)[1]
+        half = (nw-1)//2
+
+        # Current points being computed and their windows.
+        center = slice(blk, end)
+        crange = slice(blk-half, end-half)
+
+        # Geometry of each point, as columns, and across each window.
+        F = self.F_km_vals[center]
+        phi0 = self.phi_rad_vals[center, None]
+        r0 = sliding_window_view(self.rho_km_vals, nw)[crange]
+        kD = sliding_window_view(kD_vals, nw)[crange]
+        phi = np.empty((end-blk, nw))
+        phi[...] = phi0
+
+        # Terms of psi that are the same for every Newton-Raphson step.
+        fixed = self.__psi_fixed(
+            kD, self.rho_km_vals[center, None], r0, phi0,
+            self.B_rad_vals[center, None], self.D_km_vals[center, None]
+        )
+
+        # Compute psi and its derivatives for Newton-Raphson.
+        psi_and_derivs = self.__psi_and_derivs
+        psi_vals, psi_d1, psi_d2 = psi_and_derivs(phi, fixed)
+        loop = 0
+
+        # Points iterate until converged, then take one final step.
+        # Only the rows of points still iterating are computed, and
+        # psi_d1 and psi_d2 hold the derivatives for those rows.
+        active = np.flatnonzero(_max_abs_rows(psi_d1) > NEWTON_TOL)
+        psi_d1 = psi_d1[active]
+        psi_d2 = psi_d2[active]
+        while (np.size(active) > 0):
+            done = (_max_abs_rows(psi_d1) <= NEWTON_TOL)
+
+            # Rows are only gathered if some points have finished.
+            if (np.size(active) == end-blk):
+                rows = slice(None)
+                fixed_a = fixed
+            else:
+                rows = active
+                fixed_a = np.take(fixed, active, axis=1)
+
+            # Newton-Raphson
+            phi_a = phi[rows] - psi_d1 / psi_d2
+            phi[rows] = phi_a
+            psi_a, psi_d1, psi_d2 = psi_and_derivs(phi_a, fixed_a)
+            psi_vals[rows] = psi_a
+
+            # Add one to loop variable for each iteration
+            loop += 1
+            if (loop >= NEWTON_MAX_ITER):
+                break
+
+            # Drop the points that have finished.
+            keep = np.flatnonzero(np.logical_not(done))
+            active = active[keep]
+            psi_d1 = psi_d1[keep]
+            psi_d2 = psi_d2[keep]
+
+        # Range of diffracted data that falls inside each window.
+        T = sliding_window_view(T_in, nw)[crange]
+        T_sum, ker_sum = self.__kernel_sums(w_ker, psi_vals, T)
+
+        # Scale factor of the 'approximate' Fresnel Inversion.
+        scale = self.dx_km*(1.0+1.0j)/(2.0*F)
+
+        # If normalization has been set, divide by the freespace
+        # integral of the kernel, sqrt(2) F / |sum(ker) dx|.
+        if self.norm:
+            scale *= SQRT_2*F/np.abs(ker_sum*self.dx_km)
+
+        # Compute 'approximate' Fresnel Inversion for the block.
+        T_out[center] = T_sum*scale
+        return loop
 
     def __ftrans(self, fwd):
         """
@@ -1708,11 +2137,6 @@ class DiffractionCorrection(object):
                 :T_out (*np.ndarray*):
                     Complex transmittance.
         """
-        # Compute product of wavenumber and RIP distance.
-        kD_vals = TWO_PI * self.D_km_vals / self.lambda_sky_km_vals
-
-        # Define functions.
-        fw = self.__func_dict[self.wtype]["func"]
         mes = "\t\tPt: %d  Tot: %d  Width: %d  Psi Iters: %d"
 
         # If forward transform, adjust starting point by half a window.
@@ -1728,540 +2152,74 @@ class DiffractionCorrection(object):
             T_in = self.T_hat_vals
         
         # Create empty array for reconstruction / forward transform.
-        T_out = T_in * 0.0
-
-        # Compute first window width and window function.
-        w_init = self.w_km_vals[start]
-        w_func = fw(w_init, self.dx_km)
-
-        # Compute number of points in window function
-        nw = np.size(w_func)
-
-        # Computed range about the first point
-        crange = np.arange(int(start-(nw-1)/2), int(1+start+(nw-1)/2))
-
-        # Compute current radius and RIP distance.
-        r = self.rho_km_vals[start]
-        r0 = self.rho_km_vals[crange]
-
-        if (self.psitype == 'fresnel'):
-            crange -= 1
-            F2 = (self.F_km_vals*self.F_km_vals).tolist()
-            x = r-r0
-            x2 = HALF_PI * x * x
-            loop = 0
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
-
-                # Window width and Frensel scale for current point.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
-
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
-
-                    # Reset number of window points
-                    nw = np.size(w_func)
-
-                    # Computed range for current point
-                    crange = np.arange(int(center-(nw-1)/2),
-                                       int(1+center+(nw-1)/2))
-
-                    # Ajdust ring radius by dx_km.
-                    r0 = self.rho_km_vals[crange]
-                    r = self.rho_km_vals[center]
-
-                    # Compute psi for with stationary phase value
-                    x = r-r0
-                    x2 = HALF_PI * x * x
-                else:
-                    crange += 1
-                
-                psi_vals = x2 / F2[center]
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
-                else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
-
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(0.5+0.5j)/F
-
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-
-                if self.verbose:
-                    print(mes % (i, n_used, nw, loop), end="\r")
-            if self.verbose:
-                print("\n")
-        elif (self.psitype == 'fresnel3'):
-            crange -= 1
-            cosb = np.cos(self.B_rad_vals)
-            cosp = np.cos(self.phi_rad_vals)
-            sinp = np.sin(self.phi_rad_vals)
-            A_2 = 0.5*cosb*cosb*sinp*sinp/(1-cosb*cosb*sinp*sinp)
-
-            # Legendre polynomials
-            P_1 = cosb*cosp
-            P_1_1 = P_1*P_1
-            P_2 = (3.0*P_1_1-1.0)*0.5
-            P_1_2 = 2.0*P_1*P_2
-            P_3 = (5.0*P_1_1-3.0)*0.5*P_1
-
-            # Second set of polynomials.
-            b_0 = (1.0-P_1_1)*0.5
-            b_1 = (P_1-P_1*P_2)/3.0
-            b_2 = (P_2-P_1*P_3)*0.25
-
-            # Initial radial parameter
-            x = r-r0
-            x2 = x*x
-
-            # D_km_vals and the square of it.
-            d = self.D_km_vals
-            d2 = d*d
-
-            loop = 0
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
-
-                # Window width and Frensel scale for current point.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
-
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
-
-                    # Reset number of window points
-                    nw = np.size(w_func)
-
-                    # Computed range for current point
-                    crange = np.arange(int(center-(nw-1)/2),
-                                       int(1+center+(nw-1)/2))
-
-                    # Ajdust ring radius by dx_km.
-                    r = self.rho_km_vals[center]
-                    r0 = self.rho_km_vals[crange]
-                    x = r-r0
-                    x2 = x*x
-                else:
-                    crange += 1
-                
-                z = x/d[center]
-                z2 = x2/d2[center]
-
-                psi_vals = z2*(b_0[center]-A_2[center]*P_1_1[center]+
-                               (b_1[center]-A_2[center]*P_1_2[center])*z)
-
-                psi_vals *= kD_vals[center]
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
-                else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
-
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(1.0+1.0j)/(2.0*F)
-
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-                if self.verbose:
-                    print(mes % (i, n_used, nw, loop), end="\r")
-            if self.verbose:
-                print("\n", end="\r")
-        elif (self.psitype == 'fresnel4'):
-            crange -= 1
-            cosb = np.cos(self.B_rad_vals)
-            cosp = np.cos(self.phi_rad_vals)
-            sinp = np.sin(self.phi_rad_vals)
-            A_2 = 0.5*cosb*cosb*sinp*sinp/(1.0-cosb*cosb*sinp*sinp)
-
-            # Legendre polynomials
-            P_1 = cosb*cosp
-            P12 = P_1*P_1
-            P_2 = (3.0*P12-1.0)*0.5
-            P_3 = (5.0*P12-3.0)*0.5*P_1
-
-            # Products of Legendre Polynomials used in Expansion
-            C_0 = P_1*P_1
-            C_1 = 2.0*P_1*P_2
-            C_2 = P_2*P_2
-
-            # Second set of polynomials.
-            b_0 = (1.0-P12)*0.5
-            b_1 = (P_1-P_1*P_2)/3.0
-            b_2 = (P_2-P_1*P_3)*0.25
-
-            # Initial radial parameter
-            x = (r-r0)
-            x2 = x*x
-
-            # D_km_vals and the square of it.
-            d = self.D_km_vals
-            d2 = d*d
-
-            loop = 0
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
-
-                # Window width and Frensel scale for current point.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
-
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
-
-                    # Reset number of window points
-                    nw = np.size(w_func)
-
-                    # Computed range for current point
-                    crange = np.arange(int(center-(nw-1)/2),
-                                       int(1+center+(nw-1)/2))
-
-                    # Ajdust ring radius by dx_km.
-                    r = self.rho_km_vals[center]
-                    r0 = self.rho_km_vals[crange]
-                    x = r-r0
-                    x2 = x*x
-                else:
-                    crange += 1
-
-                z = x/d[center]
-                z2 = x2/d2[center]
-
-                psi_vals = b_0[center]-A_2[center]*C_0[center]
-                psi_vals += z*(b_1[center]-A_2[center]*C_1[center])
-                psi_vals += z2*(b_2[center]-A_2[center]*C_2[center])
-                psi_vals *= kD_vals[center]*z2
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
-                else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
-
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(1.0+1.0j)/(2.0*F)
-
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-                if self.verbose:
-                    print(mes % (i, n_used, nw, loop), end="\r")
-            if self.verbose:
-                print("\n", end="\r")
-        elif (self.psitype == 'fresnel6'):
-            crange -= 1
-            cosb = np.cos(self.B_rad_vals)
-            cosp = np.cos(self.phi_rad_vals)
-            sinp = np.sin(self.phi_rad_vals)
-            A_2 = 0.5*cosb*cosb*sinp*sinp/(1.0-cosb*cosb*sinp*sinp)
-
-            # Legendre polynomials
-            P_1 = cosb*cosp
-            P12 = P_1*P_1
-            P_2 = (3.0*P12-1.0)*0.5
-            P_3 = (5.0*P12-3.0)*0.5*P_1
-            P_4 = (35.0*P12*P12-30.0*P12+3.0)/8.0
-            P_5 = P_1*(63.0*P12*P12-70.0*P12+15.0)/8.0
-
-            # Second set of polynomials.
-            b_0 = (1.0-P12)*0.5
-            b_1 = (P_1-P_1*P_2)/3.0
-            b_2 = (P_2-P_1*P_3)*0.25
-            b_3 = (P_3-P_1*P_4)*0.2
-            b_4 = (P_4-P_1*P_5)/6.0
-
-            x = r-r0
-            x2 = x*x
-            x3 = x2*x
-            x4 = x3*x
-
-            # Products of Legendre Polynomials used in Expansion
-            C_0 = P_1*P_1
-            C_1 = 2.0*P_1*P_2
-            C_2 = P_2*P_2+2.0*P_1*P_3
-            C_3 = 2.0*P_2*P_3
-            C_4 = P_3*P_3
-
-            # D_km_vals and various powers.
-            d = self.D_km_vals
-            d2 = d*d
-            d3 = d*d2
-            d4 = d*d3
-
-            loop = 0
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
-
-                # Window width and Frensel scale for current point.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
-
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
-
-                    # Reset number of window points
-                    nw = np.size(w_func)
-
-                    # Computed range for current point
-                    crange = np.arange(int(center-(nw-1)/2),
-                                       int(1+center+(nw-1)/2))
-
-                    # Ajdust ring radius by dx_km.
-                    r = self.rho_km_vals[center]
-                    r0 = self.rho_km_vals[crange]
-                    x = r-r0
-                    x2 = x*x
-                    x3 = x2*x
-                    x4 = x3*x
-                else:
-                    crange += 1
-
-                z = x/d[center]
-                z2 = x2/d2[center]
-                z3 = x3/d3[center]
-                z4 = x4/d4[center]
-
-                psi_vals = b_0[center]-A_2[crange]*C_0[center]
-                psi_vals += z*(b_1[center]-A_2[crange]*C_1[center])
-                psi_vals += z2*(b_2[center]-A_2[crange]*C_2[center])
-                psi_vals += z3*(b_3[center]-A_2[crange]*C_3[center])
-                psi_vals += z4*(b_4[center]-A_2[crange]*C_4[center])
-
-                psi_vals *= z2*kD_vals[center]
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
-                else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
-
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(1.0+1.0j)/(2.0*F)
-
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-                if self.verbose:
-                    print(mes % (i, n_used, nw, loop), end="\r")
-            if self.verbose:
-                print("\n", end="\r")
-        elif (self.psitype == 'fresnel8'):
-            crange -= 1
-            cosb = np.cos(self.B_rad_vals)
-            cosp = np.cos(self.phi_rad_vals)
-            sinp = np.sin(self.phi_rad_vals)
-            A_2 = 0.5*cosb*cosb*sinp*sinp/(1.0-cosb*cosb*sinp*sinp)
-
-            # Legendre polynomials
-            P_1 = cosb*cosp
-            P12 = P_1*P_1
-            P_2 = (3.0*P12-1.0)*0.5
-            P_3 = P_1*(5.0*P12-3.0)*0.5
-            P_4 = (35.0*P12*P12-30.0*P12+3.0)/8.0
-            P_5 = P_1*(63.0*P12*P12-70.0*P12+15.0)/8.0
-            P_6 = (231.0*P12*P12*P12-315.0*P12*P12+105.0*P12-5.0)/16.0
-
-            # Products of Legendre Polynomials used in Expansion
-            C_0 = P_1*P_1
-            C_1 = 2.0*P_1*P_2
-            C_2 = 2.0*P_1*P_3+P_2*P_2
-            C_3 = 2.0*P_1*P_4+2.0*P_2*P_3
-            C_4 = 2.0*P_2*P_4+P_3*P_3
-            C_5 = 2.0*P_3*P_4
-            C_6 = P_4*P_4
-
-            # Second set of polynomials.
-            b_0 = (1.0-P12)/2.0
-            b_1 = (P_1-P_1*P_2)/3.0
-            b_2 = (P_2-P_1*P_3)/4.0
-            b_3 = (P_3-P_1*P_4)/5.0
-            b_4 = (P_4-P_1*P_5)/6.0
-            b_5 = (P_5-P_1*P_4)/7.0
-            b_6 = (P_6-P_1*P_5)/8.0
-
-            x = (r-r0)
-            x2 = x*x
-            x3 = x2*x
-            x4 = x3*x
-            x5 = x4*x
-            x6 = x5*x
-
-            # D_km_vals and various powers.
-            d = self.D_km_vals
-            d2 = d*d
-            d3 = d*d2
-            d4 = d*d3
-            d5 = d*d4
-            d6 = d*d5
-
-            loop = 0
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
-
-                # Window width and Frensel scale for current point.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
-
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
-
-                    # Reset number of window points
-                    nw = np.size(w_func)
-
-                    # Computed range for current point
-                    crange = np.arange(int(center-(nw-1)/2),
-                                       int(1+center+(nw-1)/2))
-
-                    # Ajdust ring radius by dx_km.
-                    r = self.rho_km_vals[center]
-                    r0 = self.rho_km_vals[crange]
-                    x = r-r0
-                    x2 = x*x
-                    x3 = x2*x
-                    x4 = x3*x
-                    x5 = x4*x
-                    x6 = x5*x
-                else:
-                    crange += 1
-
-                z = x/d[center]
-                z2 = x2/d2[center]
-                z3 = x3/d3[center]
-                z4 = x4/d4[center]
-                z5 = x5/d5[center]
-                z6 = x6/d6[center]
-
-                psi_vals = b_0[center]-A_2[crange]*C_0[center]
-                psi_vals += z*(b_1[center]-A_2[crange]*C_1[center])
-                psi_vals += z2*(b_2[center]-A_2[crange]*C_2[center])
-                psi_vals += z3*(b_3[center]-A_2[crange]*C_3[center])
-                psi_vals += z4*(b_4[center]-A_2[crange]*C_4[center])
-                psi_vals += z5*(b_5[center]-A_2[crange]*C_5[center])
-                psi_vals += z6*(b_6[center]-A_2[crange]*C_6[center])
-
-                psi_vals *= z2*kD_vals[center]
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
-                else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
-
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(1.0+1.0j)/(2.0*F)
-
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-                if self.verbose:
-                    print(mes % (i, n_used, nw, loop), end="\r")
-            if self.verbose:
-                print("\n", end="\r")
+        T_out = np.zeros_like(T_in)
+
+        # Runs of points sharing a window, and the window of each run.
+        runs = self.__window_runs(start, n_used)
+        w_cache = self.__window_table([w for (_, _, w) in runs], fwd)
+
+        # Compute product of wavenumber and RIP distance. It is only
+        # read over the points being computed and their windows.
+        nw_max = max([np.shape(w_ker)[1] for w_ker in w_cache.values()],
+                     default=1)
+        pad = (nw_max-1)//2
+        crange = slice(max(start-pad, 0), start+n_used+pad)
+        kD_vals = np.zeros(np.size(self.D_km_vals))
+        kD_vals[crange] = (TWO_PI * self.D_km_vals[crange] /
+                           self.lambda_sky_km_vals[crange])
+
+        # The kernel sums read single precision data if requested. Only
+        # the points read by the transform need to be converted.
+        if self.single_precision:
+            T_sp = np.zeros(np.size(T_in), dtype=np.complex64)
+            T_sp[crange] = T_in[crange]
+            T_in = T_sp
+
+        # Attributes read for every block.
+        verbose = self.verbose
+        rho = self.rho_km_vals
+
+        # Per-point coefficients of the Fresnel approximation to psi.
+        full = (self.psitype == "full")
+        if full:
+            coeffs = None
         else:
-            for i in np.arange(n_used):
-                # Current point being computed.
-                center = start+i
+            coeffs = self.__psi_coeffs(kD_vals, start, n_used)
 
-                # Current window width and Fresnel scale.
-                w = self.w_km_vals[center]
-                F = self.F_km_vals[center]
+        for (first, last, w) in runs:
+            # Compute window function and number of points in window.
+            w_ker = self.__window(w, w_cache, fwd)
+            nw = np.shape(w_ker)[1]
 
-                if (np.abs(w_init - w) >= 2.0 * self.dx_km):
-                    # Reset w_init and recompute window function.
-                    w_init = w
-                    w_func = fw(w, self.dx_km)
+            # Half width of the window, in points.
+            half = (nw-1)//2
 
-                    # Reset number of window points
-                    nw = np.size(w_func)
-                else:
-                    pass
-
-                # Computed range for current point
-                crange = np.arange(int(center-(nw-1)/2),
-                                   int(1+center+(nw-1)/2))
-                
-                # Ajdust ring radius by dx_km.
-                r = self.rho_km_vals[center]
-                r0 = self.rho_km_vals[crange]
-                d = self.D_km_vals[center]
-                b = self.B_rad_vals[center]
-                phi0 = self.phi_rad_vals[center]
-                phi = self.phi_rad_vals[center] + np.zeros(nw)
-                kD = kD_vals[crange]
-
-                # Compute Newton-Raphson perturbation
-                psi_d1 = self.__dpsi(kD, r, r0, phi, phi0, b, d)
-                loop = 0
-
-                while (np.max(np.abs(psi_d1)) > 1.0e-4):
-                    psi_d1 = self.__dpsi(kD, r, r0, phi, phi0, b, d)
-                    psi_d2 = self.__d2psi(kD, r, r0, phi, phi0, b, d)
-                    
-                    # Newton-Raphson
-                    phi += -(psi_d1 / psi_d2)
-
-                    # Add one to loop variable for each iteration
-                    loop += 1
-                    if (loop > 5):
-                        break
-
-                # Compute Eta variable (MTR86 Equation 4c).
-                psi_vals = self.__psi_func(kD, r, r0, phi, phi0, b, d)
-
-                # Compute kernel function for Fresnel inverse
-                if fwd:
-                    ker = w_func*np.exp(1j*psi_vals)
+            # Radial parameter, fixed for every point in the run.
+            if full:
+                x = None
+            else:
+                x = rho[first] - rho[first-half:first+half+1]
+
+            # Compute the run in blocks of n_blk points at a time.
+            n_blk = max(1, FTRANS_BLOCK_SIZE // nw)
+            for blk in range(first, last, n_blk):
+                end = min(blk+n_blk, last)
+                if full:
+                    loop = self.__full_block(T_in, T_out, kD_vals, w_ker,
+                                             blk, end)
                 else:
-                    ker = w_func*np.exp(-1j*psi_vals)
-
-                # Range of diffracted data that falls inside the window
-                T = T_in[crange]
+                    self.__fresnel_block(T_in, T_out, coeffs, w_ker, x,
+                                         blk, end, start)
+                    loop = 0
 
-                # Compute 'approximate' Fresnel Inversion for current point
-                T_out[center] = np.sum(ker*T)*self.dx_km*(1.0+1.0j)/(2.0*F)
+                # Report progress when a block passes a multiple of
+                # VERBOSE_STRIDE points, and for the last block.
+                if verbose and (((end-start)//VERBOSE_STRIDE >
+                                 (blk-start)//VERBOSE_STRIDE) or
+                                (end == start+n_used)):
+                    print(mes % (end-1-start, n_used, nw, loop), end="\r")
 
-                # If normalization has been set, normalize the reconstruction
-                if self.norm:
-                    T_out[center] *= self.__normalize(self.dx_km, ker, F)
-                if self.verbose:
-                    print(mes % (i, n_used-1, nw, loop), end="\r")
-            if self.verbose:
-                print("\n", end="\r")
+        if verbose:
+            print("\n", end="\r")
 
         return T_out
@@ -1,13 +1,65 @@
 import numpy as np
-from scipy.special import erf, lambertw
+from functools import lru_cache
+from math import factorial
+from scipy.linalg import solve
+from scipy.signal import oaconvolve
+from scipy.special import erf, fresnel, lambertw
 from . import window_functions
 
 # Declare constants for multiples of pi.
 TWO_PI = 6.283185307179586476925287
 ONE_PI = 3.141592653589793238462643
 SQRT_PI_2 = 1.253314137315500251207883
+SQRT_TWO = 1.414213562373095048801689
+ONE_E = 2.718281828459045235360287
 RADS_PER_DEGS = 0.0174532925199432957692369
 
+# Halley steps used by resolution_inverse for real input.
+LAMBERTW_HALLEY_ITER = 4
+
+# Above this, resolution_inverse uses its asymptotic series. W - P1
+# cancels there, and the series is accurate to double precision.
+RES_INV_SERIES_MIN = 1.0e3
+
+# Weights of erf((1+i)x sqrt(pi)/2) and erf((1-i)x sqrt(pi)/2) in the
+# Fresnel integrals (swapped for the sine integral).
+FRESNEL_LEFT = 0.25-0.25j
+FRESNEL_RIGHT = 0.25+0.25j
+
+# Relative tolerance used to decide that a grid is uniform and that a
+# shift along it is a whole number of steps.
+GRID_SHIFT_RTOL = 1.0e-9
+
+# Savitzky-Golay windows at least this long are applied with an
+# overlap-add FFT convolution instead of a direct one.
+SG_FFT_WINDOW_SIZE = 256
+
+@lru_cache(maxsize=64)
+def _sg_coeffs(window_size, order, deriv, rate):
+    """
+        Purpose:
+            Compute the (reversed) Savitzky-Golay convolution kernel.
+            Results are cached since the pseudo-inverse is the costly
+            part and the same filter is usually applied many times.
+        Outputs:
+            :m (*np.ndarray*):
+                Read-only kernel, ready to pass to np.convolve.
+    """
+    # Vandermonde matrix of the window, with offsets scaled to [-1, 1]
+    # to keep the normal equations well conditioned.
+    half_window = (window_size - 1) // 2
+    x = np.arange(-half_window, half_window+1) / half_window
+    b = x[:, None] ** np.arange(order+1)[None, :]
+
+    # Row deriv of pinv(b) is e_deriv^T (b^T b)^-1 b^T, so a single
+    # Cholesky solve is needed rather than a full SVD.
+    e = np.zeros(order+1)
+    e[deriv] = rate**deriv * factorial(deriv) / half_window**deriv
+    m = b @ solve(b.T @ b, e, assume_a='pos')
+    m = np.ascontiguousarray(m[::-1])
+    m.flags.writeable = False
+    return m
+
 def savitzky_golay(y, window_size, order, deriv=0, rate=1):
     """
         Purpose:
@@ -40,7 +92,7 @@ def savitzky_golay(y, window_size, order, deriv=0, rate=1):
             high order over a odd-sized window centered at the point.
     """
     try:
-        y = np.array(y)
+        y = np.asarray(y)
     except:
         raise TypeError(
             "\n\tError Encountered:\n"
@@ -51,8 +103,8 @@ def savitzky_golay(y, window_size, order, deriv=0, rate=1):
             "\t\tysmooth = savitzky_golay(y, Window_Size, Poly_Order)"
         )
     try:
-        window_size = np.abs(np.int(window_size))
-        order = np.abs(np.int(order))
+        window_size = abs(int(window_size))
+        order = abs(int(order))
     except (ValueError, TypeError):
         raise ValueError(
             "\n\tError Encountered:\n"
@@ -81,33 +133,87 @@ def savitzky_golay(y, window_size, order, deriv=0, rate=1):
 
     half_window = (window_size - 1) // 2
 
-    # precompute coefficients
-    b = np.zeros((window_size, order+1))
-    b[..., 0] = 1
-    for k in range(half_window):
-        n0 = (half_window) - k
-        m = n0
-        n = -n0
-        for j in range(1, order+1):
-            b[k, j] = n
-            b[window_size-1-k, j] = m
-            n *= -n0
-            m *= n0
+    m = _sg_coeffs(window_size, order, deriv, rate)
 
-    b = np.mat(b)
+    # Pad the endpoints with values from the signal. This is not an
+    # odd reflection: the pads are y[0] - |y[k] - y[0]| on the left and
+    # y[-1] + |y[-1-k] - y[-1]| on the right, built in place.
+    n = np.size(y)
+    y_pad = np.empty(n + 2*half_window, dtype=y.dtype)
+    first = y_pad[:half_window]
+    last = y_pad[n+half_window:]
+    y_pad[half_window:n+half_window] = y
+    np.subtract(y[1:half_window+1][::-1], y[0], out=first)
+    np.abs(first, out=first)
+    np.subtract(y[0], first, out=first)
+    np.subtract(y[-half_window-1:-1][::-1], y[-1], out=last)
+    np.abs(last, out=last)
+    np.add(y[-1], last, out=last)
+    y = y_pad
 
-    m = 1
-    for i in range(deriv):
-        m *= rate*(deriv-i)
+    if (window_size >= SG_FFT_WINDOW_SIZE):
+        return oaconvolve(y, m, mode='valid')
+    else:
+        return np.convolve(m, y, mode='valid')
 
-    m *= np.linalg.pinv(b).A[deriv]
+def _as_pos_real(x, func, ordinal, positive=True):
+    """
+        Purpose:
+            Convert an input to a numpy array and check that it
+            is real valued, and optionally non-negative.
+        Arguments:
+            :x:
+                The input to be checked.
+            :func (*str*):
+                Name of the calling function, used in errors.
+            :ordinal (*str*):
+                Position of x in the call, e.g. "First".
+        Keywords:
+            :positive (*bool*):
+                Also require that no element of x is negative.
+        Outputs:
+            :arr (*np.ndarray*):
+                x as a numpy array. No copy is made.
+    """
+    try:
+        arr = np.asarray(x)
+    except (ValueError, TypeError):
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffrec Subpackage\n"
+            "\tspecial_functions.%s:\n"
+            "\t\t%s input could not be converted\n"
+            "\t\tinto a numpy array.\n" % (func, ordinal)
+        )
 
-    # Pad the endpoints with values from the signal.
-    firstvals = y[0] - np.abs(y[1:half_window+1][::-1] - y[0])
-    lastvals = y[-1] + np.abs(y[-half_window-1:-1][::-1] - y[-1])
-    y = np.concatenate((firstvals, y, lastvals))
+    # Only complex arrays need an element-wise scan to be ruled real.
+    kind = arr.dtype.kind
+    if (kind == "c"):
+        is_real = (not np.any(arr.imag))
+    else:
+        is_real = (kind in "biuf")
 
-    return np.convolve(m[::-1], y, mode='valid')
+    if (not is_real):
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffrec Subpackage\n"
+            "\tspecial_functions.%s:\n"
+            "\t\t%s input must be an array\n"
+            "\t\tof floating point numbers.\n" % (func, ordinal)
+        )
+    elif (positive and (kind not in "bu") and arr.size
+            and (np.min(arr) < 0.0)):
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffrec Subpackage\n"
+            "\tspecial_functions.%s:\n"
+            "\t\t%s input must be an array\n"
+            "\t\tof positive numbers.\n" % (func, ordinal)
+        )
+    else:
+        pass
+
+    return arr
 
 def compute_norm_eq(w_func, error_check=True):
     """
@@ -155,38 +261,13 @@ def compute_norm_eq(w_func, error_check=True):
                 1.50015
     """
     if error_check:
-        try:
-            w_func = np.array(w_func)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.compute_norm_eq:\n"
-                "\t\tFirst input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
+        w_func = _as_pos_real(w_func, "compute_norm_eq", "First")
 
-        if (not np.all(np.isreal(w_func))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.compute_norm_eq:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof floating point numbers.\n"
-            )
-        elif (np.min(w_func) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.compute_norm_eq:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
+    # The sum of squares is a BLAS dot, so w_func*w_func is never formed.
+    w_func = np.ravel(w_func)
     nw = np.size(w_func)
     tot = np.sum(w_func)
-    normeq = nw*(np.sum(w_func*w_func)) / (tot*tot)
+    normeq = nw*np.dot(w_func, w_func) / (tot*tot)
 
     return normeq
 
@@ -218,123 +299,37 @@ def fresnel_scale(Lambda, d, phi, b, deg=False, error_check=True):
             make sure to set deg=True. Default is radians.
     """
     if error_check:
-        try:
-            Lambda = np.array(Lambda)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tFirst input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(Lambda))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof floating point numbers.\n"
-            )
-        elif (np.min(Lambda) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
-
-        try:
-            d = np.array(d)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tSecond input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(d))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tSecond input must be an array\n"
-                "\t\tof floating point numbers.\n"
-            )
-        elif (np.min(d) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tSecond input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
-
-        try:
-            phi = np.array(phi)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tThird input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(phi))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tThird input must be an array\n"
-                "\t\tof floating point numbers.\n"
-            )
-        else:
-            pass
-
-        try:
-            b = np.array(b)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tSecond input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(b))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.fresnel_scale:\n"
-                "\t\tSecond input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        else:
-            pass
+        Lambda = _as_pos_real(Lambda, "fresnel_scale", "First")
+        d = _as_pos_real(d, "fresnel_scale", "Second")
+        phi = _as_pos_real(phi, "fresnel_scale", "Third", positive=False)
+        b = _as_pos_real(b, "fresnel_scale", "Fourth", positive=False)
     else:
         pass
 
     if deg:
-        cb = np.cos(b * RADS_PER_DEGS)
-        sb = np.sin(b * RADS_PER_DEGS)
-        sp = np.sin(phi * RADS_PER_DEGS)
+        b = b * RADS_PER_DEGS
+        phi = phi * RADS_PER_DEGS
     else:
-        cb = np.cos(b)
-        sb = np.sin(b)
-        sp = np.sin(phi)
+        pass
+
+    # Evaluate in two output-sized buffers, updated in place.
+    shape = np.broadcast(Lambda, d, phi, b).shape
+    fres = np.empty(shape)
+    trig = np.empty(shape)
 
-    fres = np.sqrt(0.5 * Lambda * d * (1 - (cb*cb) * (sp*sp)) / (sb*sb))
-    return fres
+    # fres = sqrt(Lambda d (1 - cos(b)^2 sin(phi)^2) / (2 sin(b)^2)).
+    np.cos(b, out=fres)
+    fres *= fres
+    np.sin(phi, out=trig)
+    trig *= trig
+    fres *= trig
+    np.subtract(1, fres, out=fres)
+    fres *= 0.5 * Lambda * d
+    np.sin(b, out=trig)
+    trig *= trig
+    fres /= trig
+    np.sqrt(fres, out=fres)
+    return fres[()]
 
 def fresnel_inverse(T_hat, ker, dx, f_scale):
     """
@@ -346,7 +341,8 @@ def fresnel_inverse(T_hat, ker, dx, f_scale):
                 The complex transmittance of the
                 normalized diffraction data.
             :ker (*np.ndarray*):
-                he Fresnel Kernel.
+                The Fresnel Kernel. This is not conjugated, and
+                must have the same size as T_hat.
             :dx (*float*):
                 The spacing between points in the window.
                 This is equivalent to the sample spacing.
@@ -358,7 +354,9 @@ def fresnel_inverse(T_hat, ker, dx, f_scale):
                 The fresnel inversion about the center
                 of the Fresnel Kernel.
     """
-    T = np.sum(ker * T_hat) * dx * (1.0+1.0j) / (2.0 * f_scale)
+    # Unconjugated dot product, so no ker*T_hat temporary is formed.
+    T = np.dot(np.ravel(ker), np.ravel(T_hat))
+    T *= dx * (1.0+1.0j) / (2.0 * f_scale)
     return T
 
 def psi_func(kD, r, r0, phi, phi0, B, D, error_check=True):
@@ -366,184 +364,126 @@ def psi_func(kD, r, r0, phi, phi0, B, D, error_check=True):
         Purpose:
             Calculate psi from geometry variables.
         Arguments:
+            :kD (*np.ndarray* or *float*):
+                Wavenumber times RIP-Spacecraft distance.
             :r (*np.ndarray*):
                 Ring radius variable, in kilometers.
-            :r0 (*float*):
+            :r0 (*np.ndarray* or *float*):
                 Ring intercept point, in kilometers.
-            :d (*float*):
-                RIP-Spacecraft distance in kilometers.
-            :b (*float*):
-                The ring opening angle, in radians.
             :phi (*np.ndarray*):
                 The ring azimuth angle or r, in radians.
-            :phi0 (*np.ndarray*):
+            :phi0 (*np.ndarray* or *float*):
                 The ring azimuth angle for r0, in radians.
+            :B (*np.ndarray* or *float*):
+                The ring opening angle, in radians.
+            :D (*np.ndarray* or *float*):
+                RIP-Spacecraft distance in kilometers.
         Keywords:
-            :verbose (*bool*):
-                Boolean for printing out information to
-                the command line.
+            :error_check (*bool*):
+                Validate the inputs before computing psi.
         Outputs:
             :psi (*np.ndarray*):
                 Geometric quantity found in the Fresnel kernel.
+        Notes:
+            All arguments broadcast against each other, so many
+            windows can be evaluated in one call. Pass r and phi
+            with shape (n_windows, n_points) and the per-window
+            values r0, phi0 (and kD, B, D if they vary) with
+            shape (n_windows, 1).
     """
     if error_check:
-        try:
-            r = np.array(r)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFirst input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(r))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        elif (np.min(r) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
-        
-        try:
-            r0 = np.array(r0)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tSecond input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(r0))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        elif (np.min(r0) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFirst input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
-        
-        try:
-            D = np.array(D)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tThird input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(D))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tThird input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        elif (np.min(D) < 0.0):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tThird input must be an array\n"
-                "\t\tof positive numbers.\n"
-            )
-        else:
-            pass
+        r = _as_pos_real(r, "psi_func", "First")
+        r0 = _as_pos_real(r0, "psi_func", "Second")
+        D = _as_pos_real(D, "psi_func", "Third")
+        B = _as_pos_real(B, "psi_func", "Fourth", positive=False)
+        phi = _as_pos_real(phi, "psi_func", "Fifth", positive=False)
 
-        try:
-            B = np.array(B)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFourth input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(B))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFourth input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        else:
-            pass
-
-        try:
-            phi = np.array(phi)
-        except (ValueError, TypeError):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFifth input could not be converted\n"
-                "\t\tinto a numpy array.\n"
-            )
-
-        if (not np.all(np.isreal(phi))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffrec Subpackage\n"
-                "\tspecial_functions.psi_d1_phi:\n"
-                "\t\tFifth input must be an array\n"
-                "\t\tof floating point number.\n"
-            )
-        else:
-            pass
-
-        if (not isinstance(phi0, float)):
+        if (np.ndim(phi0) > 0):
+            phi0 = _as_pos_real(phi0, "psi_func", "Sixth", positive=False)
+        elif (not isinstance(phi0, float)):
             try:
                 phi0 = float(phi0)
             except (TypeError, ValueError):
                 raise TypeError(
                     "\n\tError Encountered:\n"
                     "\trss_ringoccs: Diffrec Subpackage\n"
-                    "\tspecial_functions.psi_d1_phi:\n"
-                    "\t\tSecond input must be a positive\n"
-                    "\t\tfloating point number.\n"
+                    "\tspecial_functions.psi_func:\n"
+                    "\t\tphi0 must be a floating\n"
+                    "\t\tpoint number.\n"
                 )
         else:
             pass
     else:
         pass
 
+    # Work in two output-sized buffers, updated in place.
+    cb_d = np.cos(B)/D
+    shape = np.broadcast(kD, r, r0, phi, phi0, cb_d).shape
+    xi = np.empty(shape)
+    psi_vals = np.empty(shape)
+
     # Compute Xi variable (MTR86 Equation 4b).
-    xi = (np.cos(B)/D) * (r * np.cos(phi) - r0 * np.cos(phi0))
+    np.multiply(r, np.cos(phi), out=xi)
+    xi -= r0 * np.cos(phi0)
+    xi *= cb_d
 
     # Compute Eta variable (MTR86 Equation 4c).
-    eta = (r0*r0 + r*r - 2.0*r*r0*np.cos(phi-phi0)) / (D*D)
-    psi_vals = kD * (np.sqrt(1.0+eta-2.0*xi) - (1.0-xi))
-    return psi_vals
+    np.subtract(phi, phi0, out=psi_vals)
+    np.cos(psi_vals, out=psi_vals)
+    psi_vals *= 2.0*r*r0
+    np.subtract(r0*r0 + r*r, psi_vals, out=psi_vals)
+    psi_vals /= D*D
+
+    # psi = kD * (sqrt(1 + eta - 2 xi) - (1 - xi)).
+    psi_vals += 1.0
+    psi_vals -= 2.0*xi
+    np.sqrt(psi_vals, out=psi_vals)
+    np.subtract(1.0, xi, out=xi)
+    psi_vals -= xi
+    psi_vals *= kD
+    return psi_vals[()]
+
+def _resolution_inverse_real(x):
+    """
+        Purpose:
+            Real valued resolution_inverse for x > 1. The principal
+            branch W(P1*exp(P1)), P1 = x/(1-x), is found with Halley's
+            method started from the series about the branch point
+            -1/e, which is accurate to double precision after
+            LAMBERTW_HALLEY_ITER steps on the whole domain.
+            For x >= RES_INV_SERIES_MIN, W - P1 cancels, so the
+            asymptotic series 2/t (1 + 1/(9t^2) - 2/(135t^3)),
+            t = x - 2/3, is used instead.
+        Arguments:
+            :x (*np.ndarray* or *float*):
+                Real independent variable, greater than 1.
+        Outputs:
+            :f (*np.ndarray* or *float*):
+                The inverse of x/(exp(-x)+x-1)
+    """
+    x = np.asarray(x, dtype=float)
+    f = np.empty(np.shape(x))
+    big = (x >= RES_INV_SERIES_MIN)
+
+    # Asymptotic series, in powers of 1/t so that nothing overflows.
+    s = 1.0/(x[big] - 2.0/3.0)
+    f[big] = 2.0*s*(1.0 + s*s*(1.0/9.0 - s*(2.0/135.0)))
+
+    x = x[~big]
+    P1 = x/(1.0-x)
+    P2 = P1*np.exp(P1)
+
+    # W = -1 + p - p^2/3 + 11/72 p^3, p = sqrt(2(e*P2 + 1)).
+    p = np.sqrt(np.maximum(2.0*(ONE_E*P2 + 1.0), 0.0))
+    w = -1.0 + p*(1.0 + p*(-1.0/3.0 + p*(11.0/72.0)))
+    for _ in range(LAMBERTW_HALLEY_ITER):
+        ew = np.exp(w)
+        f_w = w*ew - P2
+        w1 = w + 1.0
+        w = w - f_w/(ew*w1 - (w+2.0)*f_w/(2.0*w1))
+
+    f[~big] = w - P1
+    return f[()]
 
 def resolution_inverse(x, error_check=True):
     """
@@ -563,6 +503,8 @@ def resolution_inverse(x, error_check=True):
             LambertW function. This function is the inverse of
             y = x * exp(x). This is computed using the scipy.special
             subpackage using their lambertw function.
+            For real x, W is instead found directly with a few
+            vectorized Halley iterations.
         Warnings:
             #. The real part of the argument must be greater than 1.
             #. The scipy.special lambertw function is slightly
@@ -579,30 +521,8 @@ def resolution_inverse(x, error_check=True):
                 (Beautiful plots appear here)
     """
     if error_check:
-        y = x
-        try:
-            x = np.array(x)
-            if (not np.all(np.isreal(x))) and (not np.all(np.iscomplex(x))):
-                raise TypeError(
-                    "\n\tError Encountered:\n"
-                    "\trss_ringoccs: Diffcorr Subpackage\n"
-                    "\tspecial_function.resolution_inverse:\n"
-                    "\t\tInput must be a real or complex valued numpy array.\n"
-                    "\t\tThe elements of your array have type: %s"
-                    % (x.dtype)
-                )
-            else:
-                del y
-        except (TypeError, ValueError) as errmes:
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffcorr Subpackage\n"
-                "\tspecial_function.resolution_inverse:\n"
-                "\t\tInput must be a real or complex valued numpy array.\n"
-                "\t\tYour input has type: %s\n"
-                "\tOriginal Error Mesage: %s\n"
-                % (type(y).__name__, errmes)
-            )
+        x = _as_num_array(x, "resolution_inverse")
+
         if (np.min(np.real(x)) <= 1.0):
             raise ValueError(
                 "\n\tError Encountered:\n"
@@ -616,12 +536,18 @@ def resolution_inverse(x, error_check=True):
         else:
             pass
 
+    if np.isrealobj(x):
+        return _resolution_inverse_real(x)
+    else:
+        pass
+
     P1 = x/(1.0-x)
     P2 = P1*np.exp(P1)
     f = lambertw(P2)-P1
 
-    if np.all(np.isreal(x)):
-        f = np.real(f)
+    # Complex input with no imaginary part gives a real result.
+    if (not np.any(np.imag(x))):
+        f = f.real
 
     return f
 
@@ -646,6 +572,8 @@ def fresnel_cos(x, error_check=True):
                 y = 2/sqrt(pi) * integral (t=0 to x) exp(-t^2)dt.
                 Using Euler's Formula for exponentials allows one
                 to use this to solve for the Fresnel Cosine integral.
+                Real input is instead evaluated with the rational
+                approximations of scipy.special.fresnel.
             [3] The Fresnel Cosine integral is used for the solution
                 of diffraction through a square well. Because of this
                 it is useful for forward modeling problems in 
@@ -660,38 +588,20 @@ def fresnel_cos(x, error_check=True):
                 In [6]: plt.show(plt.plot(x,y))
     """
     if error_check:
-        y = x
-        try:
-            x = np.array(x)
-            if (not np.all(np.isreal(x))) and (not np.all(np.iscomplex(x))):
-                raise TypeError(
-                    "\n\tError Encountered:\n"
-                    "\trss_ringoccs: Diffcorr Subpackage\n"
-                    "\tspecial_functions.fresnel_cos:\n"
-                    "\t\tInput must be a real or complex valued numpy array.\n"
-                    "\t\tThe elements of your array have type: %s"
-                    % (x.dtype)
-                )
-            else:
-                del y
-        except (TypeError, ValueError) as errmes:
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffcorr Subpackage\n"
-                "\tspecial_function.fresnel_cos:\n"
-                "\t\tInput must be a real or complex valued numpy array.\n"
-                "\t\tYour input has type: %s\n"
-                "\tOriginal Error Mesage: %s\n"
-                % (type(y).__name__, errmes)
-            )
+        x = _as_num_array(x, "fresnel_cos")
     else:
         pass
 
-    f_cos = ((0.25-0.25j)*erf((1.0+1.0j)*x*SQRT_PI_2)+
-             (0.25+0.25j)*erf((1.0-1.0j)*x*SQRT_PI_2))
+    if np.isrealobj(x):
+        # Real input uses the rational approximations in scipy.special,
+        # which are normalized to the integral of cos(pi/2 * t^2).
+        f_cos = fresnel(SQRT_TWO*x)[1]
+    else:
+        f_cos = (FRESNEL_LEFT*erf((1.0+1.0j)*x*SQRT_PI_2)+
+                 FRESNEL_RIGHT*erf((1.0-1.0j)*x*SQRT_PI_2))
 
-    if (np.isreal(x).all()):
-        f_cos = np.real(f_cos)
+        if (not np.any(x.imag)):
+            f_cos = f_cos.real
 
     return f_cos
 
@@ -716,6 +626,8 @@ def fresnel_sin(x, error_check=True):
                 y = 2/sqrt(pi) * integral (t=0 to x) exp(-t^2)dt.
                 Using Euler's Formula for exponentials allows one
                 to use this to solve for the Fresnel Sine integral.
+                Real input is instead evaluated with the rational
+                approximations of scipy.special.fresnel.
             [3] The Fresnel sine integral is used for the solution
                 of diffraction through a square well. Because of this
                 is is useful for forward modeling problems in 
@@ -730,41 +642,204 @@ def fresnel_sin(x, error_check=True):
                 In [6]: plt.show(plt.plot(x,y))
     """
     if error_check:
-        y = x
-        try:
-            x = np.array(x)
-            if (not np.all(np.isreal(x))) and (not np.all(np.iscomplex(x))):
-                raise TypeError(
-                    "\n\tError Encountered:\n"
-                    "\trss_ringoccs: Diffcorr Subpackage\n"
-                    "\tspecial_function.fresnel_cos:\n"
-                    "\t\tInput must be a real or complex valued numpy array.\n"
-                    "\t\tThe elements of your array have type: %s"
-                    % (x.dtype)
-                )
-            else:
-                del y
-        except (TypeError, ValueError) as errmes:
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffcorr Subpackage\n"
-                "\tspecial_function.fresnel_cos:\n"
-                "\t\tInput must be a real or complex valued numpy array.\n"
-                "\t\tYour input has type: %s\n"
-                "\tOriginal Error Mesage: %s\n"
-                % (type(y).__name__, errmes)
-            )
+        x = _as_num_array(x, "fresnel_sin")
     else:
         pass
 
-    f_sin = ((0.25+0.25j)*erf((1.0+1.0j)*x*SQRT_PI_2)+
-             (0.25-0.25j)*erf((1.0-1.0j)*x*SQRT_PI_2))
+    if np.isrealobj(x):
+        # Real input uses the rational approximations in scipy.special,
+        # which are normalized to the integral of sin(pi/2 * t^2).
+        f_sin = fresnel(SQRT_TWO*x)[0]
+    else:
+        f_sin = (FRESNEL_RIGHT*erf((1.0+1.0j)*x*SQRT_PI_2)+
+                 FRESNEL_LEFT*erf((1.0-1.0j)*x*SQRT_PI_2))
 
-    if (np.isreal(x).all()):
-        f_sin = np.real(f_sin)
+        if (not np.any(x.imag)):
+            f_sin = f_sin.real
 
     return f_sin
 
+def fresnel_cs(x, error_check=True):
+    """
+        Purpose:
+            Compute the Fresnel cosine and sine integrals together.
+        Arguments:
+            :x (*np.ndarray* or *float*):
+                A real or complex number, or numpy array.
+        Outputs:
+            :f_cos (*np.ndarray* or *float*):
+                The fresnel cosine integral of x.
+            :f_sin (*np.ndarray* or *float*):
+                The fresnel sine integral of x.
+        Notes:
+            This gives the same values as fresnel_cos and
+            fresnel_sin, but the expensive part (scipy.special.fresnel
+            for real input, the two erf terms for complex input) is
+            only evaluated once for both integrals.
+    """
+    if error_check:
+        x = _as_num_array(x, "fresnel_cs")
+    else:
+        pass
+
+    if np.isrealobj(x):
+        f_sin, f_cos = fresnel(SQRT_TWO*x)
+    else:
+        e_plus = erf((1.0+1.0j)*x*SQRT_PI_2)
+        e_minus = erf((1.0-1.0j)*x*SQRT_PI_2)
+        f_cos = FRESNEL_LEFT*e_plus + FRESNEL_RIGHT*e_minus
+        f_sin = FRESNEL_RIGHT*e_plus + FRESNEL_LEFT*e_minus
+
+        if (not np.any(x.imag)):
+            f_cos = f_cos.real
+            f_sin = f_sin.real
+
+    return f_cos, f_sin
+
+def _as_num_array(x, func):
+    """
+        Purpose:
+            Convert the first input of a diffraction solver to a
+            numpy array and check that it is real or complex valued.
+        Arguments:
+            :x:
+                The input to be checked.
+            :func (*str*):
+                Name of the calling function, used in errors.
+        Outputs:
+            :arr (*np.ndarray*):
+                x as a numpy array. No copy is made.
+    """
+    try:
+        arr = np.asarray(x)
+    except (ValueError, TypeError) as errmes:
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffcorr Subpackage\n"
+            "\tspecial_function.%s:\n"
+            "\t\tFirst input must be a real or complex valued numpy array.\n"
+            "\t\tYour input has type: %s\n"
+            "\tOriginal Error Mesage: %s\n"
+            % (func, type(x).__name__, errmes)
+        )
+
+    if (arr.dtype.kind not in "biufc"):
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffcorr Subpackage\n"
+            "\tspecial_function.%s:\n"
+            "\t\tFirst input must be a real or complex valued numpy array.\n"
+            "\t\tThe elements of your array have type: %s\n"
+            % (func, arr.dtype)
+        )
+    else:
+        pass
+
+    return arr
+
+def _as_float(v, func, ordinal):
+    """
+        Purpose:
+            Convert a scalar parameter of a diffraction solver
+            to a float.
+        Arguments:
+            :v:
+                The parameter to be converted.
+            :func (*str*):
+                Name of the calling function, used in errors.
+            :ordinal (*str*):
+                Position of v in the call, e.g. "Second".
+        Outputs:
+            :v (*float*):
+                v as a float.
+    """
+    if isinstance(v, float):
+        return v
+    else:
+        pass
+
+    try:
+        return float(v)
+    except (ValueError, TypeError):
+        raise TypeError(
+            "\n\tError Encountered:\n"
+            "\trss_ringoccs: Diffcorr Subpackage\n"
+            "\tspecial_function.%s:\n"
+            "\t\t%s input must be a floating point number.\n"
+            "\t\tYour input has type: %s\n"
+            % (func, ordinal, type(v).__name__)
+        )
+
+def _sinc(scale, x):
+    """
+        Purpose:
+            Compute np.sinc(scale*x) into a new array, with
+            one temporary instead of the four np.sinc uses.
+        Arguments:
+            :scale (*float*):
+                Scalar multiplying x.
+            :x (*np.ndarray*):
+                The independent variable.
+        Outputs:
+            :f (*np.ndarray*):
+                sin(pi*scale*x)/(pi*scale*x), equal to 1 at 0.
+    """
+    t = np.asarray(scale*x)
+    t *= ONE_PI
+
+    # Same zero handling as np.sinc: sin(1e-20)/1e-20 is exactly 1.
+    t[t == 0] = 1.0e-20
+    f = np.sin(t)
+    f /= t
+    return f
+
+def slit_diffraction(x, z, a, d=None):
+    """
+        Purpose:
+            Compute Fraunhofer diffraction through a single slit,
+            or through a double slit if the slit separation d is
+            given. single_slit_diffraction and
+            double_slit_diffraction are aliases of this function.
+        Variables:
+            :x:
+                A real or complex argument, or numpy array.
+            :z (*float*):
+                The perpendicular distance from the slit
+                plane to the observer.
+            :a (*float*):
+                The slit parameter. This is a unitless paramter
+                defined as the ratio between the slit width and
+                the wavelength of the incoming signal.
+        Keywords:
+            :d (*float*):
+                The distance between slits. If None, the single
+                slit pattern is returned.
+        Outputs:
+            :f:
+                Single or double slit diffraction pattern.
+    """
+    x = _as_num_array(x, "slit_diffraction")
+    z = _as_float(z, "slit_diffraction", "Second")
+    a = _as_float(a, "slit_diffraction", "Third")
+
+    f = _sinc(a/z, x)
+    f *= f
+
+    if (d is not None):
+        d = _as_float(d, "slit_diffraction", "Fourth")
+
+        # sin(2u)^2 / (4 sin(u)^2) = cos(u)^2, with u = pi dx/z, so the
+        # double slit adds a factor cos(pi dx/z)^2. This form is also
+        # finite at the grating maxima, where the quotient is 0/0.
+        buf = np.asarray((ONE_PI*d/z)*x)
+        np.cos(buf, out=buf)
+        buf *= buf
+        f *= buf
+    else:
+        pass
+
+    return f[()]
+
 def single_slit_diffraction(x, z, a):
     """
         Purpose:
@@ -788,57 +863,7 @@ def single_slit_diffraction(x, z, a):
         Dependences:
             [1] numpy
     """
-    y = x
-    try:
-        x = np.array(x)
-        if (not np.all(np.isreal(x))) and (not np.all(np.iscomplex(x))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffcorr Subpackage\n"
-                "\tspecial_function.single_slit_diffraction_solve:\n"
-                "\t\tInput must be a real or complex valued numpy array.\n"
-                "\t\tThe elements of your array have type: %s"
-                % (x.dtype)
-            )
-        else:
-            del y
-    except (TypeError, ValueError) as errmes:
-        raise TypeError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.single_slit_diffraction_solve:\n"
-            "\t\tFirst input must be a real or complex valued numpy array.\n"
-            "\t\tYour input has type: %s\n"
-            "\tOriginal Error Mesage: %s\n"
-            % (type(y).__name__, errmes)
-        )
-    if not (isinstance(z, float)):
-        try:
-            z = float(z)
-        except ValueError:
-            raise ValueError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.single_slit_diffraction_solve:\n"
-            "\t\tSecond input must be a floating point number.\n"
-            "\t\tYour input has type: %s\n"
-            % (type(z).__name__)
-            )
-    if not (isinstance(a, float)):
-        try:
-            a = float(a)
-        except ValueError:
-            raise ValueError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.single_slit_diffraction_solve:\n"
-            "\t\tThird input must be a floating point number.\n"
-            "\t\tYour input has type: %s\n"
-            % (type(a).__name__)
-            )
-
-    f = np.sinc(a*x/z)*np.sinc(a*x/z)
-    return f
+    return slit_diffraction(x, z, a)
 
 def double_slit_diffraction(x, z, a, d):
     """
@@ -865,74 +890,71 @@ def double_slit_diffraction(x, z, a, d):
         Dependences:
             [1] numpy
     """
-    y = x
-    try:
-        x = np.array(x)
-        if (not np.all(np.isreal(x))) and (not np.all(np.iscomplex(x))):
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: Diffcorr Subpackage\n"
-                "\tspecial_function.double_slit_diffraction_solve:\n"
-                "\t\tInput must be a real or complex valued numpy array.\n"
-                "\t\tThe elements of your array have type: %s"
-                % (x.dtype)
-            )
-        else:
-            del y
-    except (TypeError, ValueError) as errmes:
-        raise TypeError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.double_slit_diffraction_solve:\n"
-            "\t\tFirst input must be a real or complex valued numpy array.\n"
-            "\t\tYour input has type: %s\n"
-            "\tOriginal Error Mesage: %s\n"
-            % (type(y).__name__, errmes)
-        )
-    if not (isinstance(z, float)):
-        try:
-            z = float(z)
-        except ValueError:
-            raise ValueError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.double_slit_diffraction_solve:\n"
-            "\t\tSecond input must be a floating point number.\n"
-            "\t\tYour input has type: %s\n"
-            % (type(z).__name__)
-            )
-    if not (isinstance(a, float)):
-        try:
-            a = float(a)
-        except ValueError:
-            raise ValueError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.double_slit_diffraction_solve:\n"
-            "\t\tThird input must be a floating point number.\n"
-            "\t\tYour input has type: %s\n"
-            % (type(a).__name__)
-            )
-    if not (isinstance(d, float)):
-        try:
-            d = float(d)
-        except ValueError:
-            raise ValueError(
-            "\n\tError Encountered:\n"
-            "\trss_ringoccs: Diffcorr Subpackage\n"
-            "\tspecial_function.double_slit_diffraction_solve:\n"
-            "\t\tFourth input must be a floating point number.\n"
-            "\t\tYour input has type: %s\n"
-            % (type(a).__name__)
-            )
-    f1 = np.sinc(a*x/z)*np.sinc(a*x/z)
-    f2 = np.sin(TWO_PI*d*x/z)*np.sin(TWO_PI*d*x/z)
-    f3 = 4.0*np.sin(ONE_PI*d*x/z)*np.sin(ONE_PI*d*x/z)
-    f = f1*f2/f3
+    return slit_diffraction(x, z, a, d)
 
-    return f
+def _sq_well_combine(d_cos, d_sin, invert):
+    """
+        Purpose:
+            Form (0.5-0.5i)(d_cos + i d_sin), or one minus it, for
+            the square well solvers. The real and imaginary parts
+            are written straight into the complex output from the
+            two real differences, so no complex temporaries are made.
+        Arguments:
+            :d_cos (*np.ndarray*):
+                Difference of the Fresnel cosine integrals.
+            :d_sin (*np.ndarray*):
+                Difference of the Fresnel sine integrals.
+            :invert (*bool*):
+                If False, return one minus the product.
+        Outputs:
+            :H (*np.ndarray*):
+                Complex diffraction pattern.
+    """
+    H = np.empty(np.shape(d_cos), dtype=np.result_type(d_cos, np.complex64))
+    H_re = H.real
+    H_im = H.imag
+
+    # (0.5-0.5i)(c + i s) = (c + s)/2 + i(s - c)/2.
+    np.add(d_cos, d_sin, out=H_re)
+    H_re *= 0.5
+    if invert:
+        np.subtract(d_sin, d_cos, out=H_im)
+    else:
+        np.subtract(1.0, H_re, out=H_re)
+        np.subtract(d_cos, d_sin, out=H_im)
+
+    H_im *= 0.5
+    return H
 
-def sq_well_solve(x, a, b, F, invert=False):
+def _grid_shift(x, shift):
+    """
+        Purpose:
+            Return the number of samples k such that x+shift lies on
+            the grid x, or None if x is not a uniform 1-D grid or the
+            shift is not a whole number of steps. Only shifts smaller
+            than the grid are returned, since otherwise the two
+            argument sets do not overlap.
+    """
+    if (x.ndim != 1) or (x.size < 3) or (x.dtype.kind not in "iuf"):
+        return None
+    else:
+        pass
+
+    dx = np.diff(x)
+    step = (x[-1]-x[0])/(x.size-1)
+    if (step <= 0) or (np.max(np.abs(dx-step)) > GRID_SHIFT_RTOL*step):
+        return None
+    else:
+        pass
+
+    k = shift/step
+    k_int = int(round(k))
+    if (k_int < 1) or (k_int >= x.size) or (abs(k-k_int) > GRID_SHIFT_RTOL):
+        return None
+    else:
+        return k_int
+
+def sq_well_solve(x, a, b, F, invert=False, single_precision=False):
     """
         Function:
             sq_well_solve
@@ -947,6 +969,17 @@ def sq_well_solve(x, a, b, F, invert=False):
                 The RIGHTMOST endpoint of the square well.
             :F (*float*):
                 The Fresnel scale.
+        Keywords:
+            :invert (*bool*):
+                If True, return the pattern of the well itself
+                rather than of its complement.
+            :single_precision (*bool*):
+                If True, the Fresnel integrals are evaluated on
+                float32 arguments and H is complex64. This halves
+                the memory used. The arguments (a-x)/F and (b-x)/F
+                are formed in double precision before the cast, and
+                the absolute error in H is about 1e-7 times the
+                largest of |a-x|/F and |b-x|/F.
         Output:
             :H:
                 Complex numpy array.
@@ -963,7 +996,8 @@ def sq_well_solve(x, a, b, F, invert=False):
                 "\tspecial_functions: sq_well_solve\n"
                 "\tFirst variable should be a numpy array.\n"
         )
-    elif (not np.isreal(x).all()):
+    elif (x.dtype.kind not in "biuf") and ((x.dtype.kind != "c") or
+                                           np.any(x.imag)):
         raise ValueError(
                 "\n\tError Encountered:\n"
                 "\trss_ringoccs: diffrec subpackage\n"
@@ -973,55 +1007,105 @@ def sq_well_solve(x, a, b, F, invert=False):
     else:
         pass
 
-    if (not isinstance(a,float)):
-        try:
-            a = float(a)
-        except TypeError:
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: diffrec subpackage\n"
-                "\tspecial_functions: sq_well_solve\n"
-                "\tSecond variable should be a floating point number.\n"
-                "\tYour input has type: %s"
-                % (type(a).__name__)
-            )
+    a = _as_float(a, "sq_well_solve", "Second")
+    b = _as_float(b, "sq_well_solve", "Third")
+    F = _as_float(F, "sq_well_solve", "Fourth")
+
+    # The arguments (edge-x)/F are always formed in double precision,
+    # since edge-x cancels at ring radii, and only then cast.
+    k = _grid_shift(x, b-a)
+    if k is None:
+        u_b = (b-x)/F
+        u_a = (a-x)/F
+        if single_precision:
+            u_b = u_b.real.astype(np.float32)
+            u_a = u_a.real.astype(np.float32)
+        else:
+            pass
+
+        # One joint Fresnel evaluation per edge of the well.
+        c_b, s_b = fresnel_cs(u_b, error_check=False)
+        c_a, s_a = fresnel_cs(u_a, error_check=False)
     else:
-        pass
+        # On a uniform grid with b-a a whole number of steps, (a-x)/F
+        # is (b-x)/F shifted by k samples. Extend the grid by k points
+        # and evaluate the Fresnel integrals over the union once.
+        n = x.size
+        u = np.empty(n+k, dtype=np.result_type(x, float))
+        u[:n] = x
+        u[n:] = np.arange(1, k+1)
+        u[n:] *= (x[-1]-x[0])/(n-1)
+        u[n:] += x[-1]
+        np.subtract(b, u, out=u)
+        u /= F
+        if single_precision:
+            u = u.astype(np.float32)
+        else:
+            pass
+
+        c_u, s_u = fresnel_cs(u, error_check=False)
+        c_b, s_b = c_u[:n], s_u[:n]
+        c_a, s_a = c_u[k:], s_u[k:]
 
-    if (not isinstance(b,float)):
-        try:
-            b = float(b)
-        except TypeError:
-            raise TypeError(
+    H = _sq_well_combine(c_b-c_a, s_b-s_a, invert)
+    return H[()]
+
+def sq_well_solve_batch(x, ab_pairs, F, invert=False,
+                        single_precision=False):
+    """
+        Purpose:
+            Computes the diffraction patterns of several square
+            wells over the same x and Fresnel scale at once.
+        Variables:
+            :x:
+                Real numpy array. The independent variable.
+            :ab_pairs (*np.ndarray*):
+                Array of shape (K, 2). Row k holds the LEFTMOST
+                and RIGHTMOST endpoints of the kth square well.
+            :F (*float*):
+                The Fresnel scale.
+        Keywords:
+            :invert (*bool*):
+                As in sq_well_solve.
+            :single_precision (*bool*):
+                As in sq_well_solve.
+        Output:
+            :H:
+                Complex numpy array of shape (K, np.size(x)).
+                Row k is sq_well_solve(x, *ab_pairs[k], F, invert).
+        Notes:
+            Each distinct endpoint is passed through fresnel_cs
+            only once, so wells that share an edge (adjacent
+            ringlets and gaps) reuse the same Fresnel integrals.
+    """
+    x = _as_pos_real(x, "sq_well_solve_batch", "First", positive=False)
+    ab_pairs = _as_pos_real(ab_pairs, "sq_well_solve_batch", "Second",
+                            positive=False)
+    F = _as_float(F, "sq_well_solve_batch", "Third")
+
+    if (np.ndim(ab_pairs) != 2) or (np.shape(ab_pairs)[1] != 2):
+        raise ValueError(
                 "\n\tError Encountered:\n"
                 "\trss_ringoccs: diffrec subpackage\n"
-                "\tspecial_functions: sq_well_solve\n"
-                "\tThird variable should be a floating point number.\n"
-                "\tYour input has type: %s"
-                % (type(b).__name__)
-            )
+                "\tspecial_functions: sq_well_solve_batch\n"
+                "\tSecond variable should have shape (K, 2).\n"
+        )
     else:
         pass
 
-    if (not isinstance(F,float)):
-        try:
-            F = float(F)
-        except TypeError:
-            raise TypeError(
-                "\n\tError Encountered:\n"
-                "\trss_ringoccs: diffrec subpackage\n"
-                "\tspecial_functions: sq_well_solve\n"
-                "\tFourth variable should be a floating point number.\n"
-                "\tYour input has type: %s"
-                % (type(b).__name__)
-            )
+    # Evaluate the Fresnel integrals once per distinct edge.
+    edges, index = np.unique(ab_pairs, return_inverse=True)
+    index = np.reshape(index, np.shape(ab_pairs))
+    # As in sq_well_solve, the arguments are formed in double precision.
+    u = (edges[:, None]-x)/F
+    if single_precision:
+        u = u.astype(np.float32)
     else:
         pass
 
-    H = (0.5 - 0.5j) * (fresnel_cos((b-x)/F)-fresnel_cos((a-x)/F)+
-                        1j*(fresnel_sin((b-x) / F)-fresnel_sin((a-x)/F)))
-
-    if not invert:
-        H = 1-H
+    f_cos, f_sin = fresnel_cs(u, error_check=False)
 
+    ia = index[:, 0]
+    ib = index[:, 1]
+    H = _sq_well_combine(f_cos[ib]-f_cos[ia], f_sin[ib]-f_sin[ia], invert)
     return H
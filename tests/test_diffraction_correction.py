@@ -0,0 +1,58 @@
+"""
+    Regression tests for rss_ringoccs.diffrec.DiffractionCorrection.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from rss_ringoccs.diffrec import DiffractionCorrection
+
+
+class _SyntheticDLP(object):
+    """
+        Purpose:
+            Minimal stand-in for a DLP instance. D varies strongly
+            across the data, so the window width varies across the
+            range being reconstructed.
+    """
+    def __init__(self, n=4000, dx=0.25, reverse=False):
+        rho = 87000.0 + dx*np.arange(n)
+        tau = 0.5 + 0.4*np.sin(rho/3.0)
+        D = 2.0e5*(1.0 + 1.5*(rho-rho[0])/(rho[-1]-rho[0]))
+        if reverse:
+            D = D[::-1].copy()
+
+        self.rho_km_vals = rho
+        self.p_norm_vals = np.exp(-tau/0.4)
+        self.phase_rad_vals = 0.2*np.sin(rho/7.0)
+        self.B_rad_vals = 0.40 + 1.0e-6*(rho-rho[0])
+        self.D_km_vals = D
+        self.phi_rad_vals = 2.0 + 2.0e-5*(rho-rho[0])
+        self.f_sky_hz_vals = 8.4e9 + 0.0*rho
+        self.rho_dot_kms_vals = 10.0 + 0.0*rho
+        self.t_oet_spm_vals = 0.1*rho
+        self.t_ret_spm_vals = 0.1*rho
+        self.t_set_spm_vals = 0.1*rho
+        self.rho_corr_pole_km_vals = 0.0*rho
+        self.rho_corr_timing_km_vals = 0.0*rho
+        self.phi_rl_rad_vals = 0.0*rho
+        self.raw_tau_threshold_vals = 0.0*rho + 3.0
+        self.history = {}
+        self.rev_info = {}
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("psitype", ["fresnel6", "fresnel8"])
+def test_fresnel_a2_full_range_varying_window(monkeypatch, psitype, reverse):
+    # The history written by DiffractionCorrection needs a login name.
+    monkeypatch.setattr(os, "getlogin", lambda: "test")
+
+    dlp = _SyntheticDLP(reverse=reverse)
+    rec = DiffractionCorrection(dlp, 1.0, rng="all", psitype=psitype)
+    assert np.ptp(rec.w_km_vals) > 2.0*rec.dx_km
+    assert np.all(np.isfinite(rec.T_vals))
+
+    # fresnel6 and fresnel8 only add higher order terms to fresnel4.
+    ref = DiffractionCorrection(dlp, 1.0, rng="all", psitype="fresnel4")
+    assert np.allclose(rec.T_vals, ref.T_vals, rtol=0.0, atol=1.0e-3)
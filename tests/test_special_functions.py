@@ -0,0 +1,76 @@
+"""
+    Regression tests for rss_ringoccs.diffrec.special_functions.
+"""
+import numpy as np
+
+from rss_ringoccs.diffrec import special_functions
+
+
+def test_sq_well_single_precision_ring_radius():
+    # At ring radii, a-x and b-x cancel, so they must be formed in
+    # double precision before the cast to float32.
+    x = np.linspace(87450.0, 87550.0, 10001)
+    a, b, F = 87490.0, 87510.0, 1.0
+    H = special_functions.sq_well_solve(x, a, b, F)
+    H_sp = special_functions.sq_well_solve(x, a, b, F,
+                                           single_precision=True)
+    assert H_sp.dtype == np.complex64
+    assert np.max(np.abs(H_sp - H)) < 1.0e-5
+
+    ab = np.array([[a, b], [a-5.0, a]])
+    H_sp = special_functions.sq_well_solve_batch(x, ab, F,
+                                                 single_precision=True)
+    assert H_sp.dtype == np.complex64
+    assert np.max(np.abs(H_sp[0] - H)) < 1.0e-5
+
+
+def test_sq_well_solve_batch_matches_single_wells():
+    # Jittered grid, so sq_well_solve takes its two-call path.
+    rng = np.random.RandomState(0)
+    x = np.linspace(-30.0, 30.0, 2001) + 1.0e-3*rng.rand(2001)
+    ab = np.array([[-5.0, 5.0], [5.0, 12.5], [-20.0, -5.0], [-5.0, 5.0]])
+    F = 1.3
+    for invert in (False, True):
+        H = special_functions.sq_well_solve_batch(x, ab, F, invert=invert)
+        assert np.shape(H) == (len(ab), np.size(x))
+        for (row, (a, b)) in zip(H, ab):
+            ref = special_functions.sq_well_solve(x, a, b, F, invert=invert)
+            assert np.array_equal(row, ref)
+
+
+def test_slit_wrappers_match_slit_diffraction():
+    x = np.linspace(-10.0, 10.0, 2001)
+    z, a, d = 1.7, 0.9, 2.37
+    f = special_functions.slit_diffraction(x, z, a)
+    assert np.array_equal(
+        special_functions.single_slit_diffraction(x, z, a), f
+    )
+    assert np.allclose(f, np.sinc(a*x/z)**2, rtol=1.0e-12, atol=0.0)
+
+    f = special_functions.slit_diffraction(x, z, a, d)
+    assert np.array_equal(
+        special_functions.double_slit_diffraction(x, z, a, d), f
+    )
+
+    # Textbook form, away from the removable zeros of sin(pi d x/z).
+    x = x[np.abs(np.sin(np.pi*d*x/z)) > 1.0e-3]
+    s = np.sin(np.pi*d*x/z)
+    ref = np.sinc(a*x/z)**2*np.sin(2.0*np.pi*d*x/z)**2/(4.0*s*s)
+    f = special_functions.slit_diffraction(x, z, a, d)
+    assert np.allclose(f, ref, rtol=1.0e-10, atol=1.0e-14)
+
+
+def test_sq_well_shared_grid_matches_two_call_path():
+    x = np.linspace(-50.0, 50.0, 100001)
+    a, b, F = -5.05, 5.0, 0.7
+    assert special_functions._grid_shift(x, b-a) is not None
+
+    # A jittered copy of the grid takes the two-call path instead.
+    x_j = x.copy()
+    x_j[1::2] += 1.0e-12
+    assert special_functions._grid_shift(x_j, b-a) is None
+
+    for invert in (False, True):
+        H = special_functions.sq_well_solve(x, a, b, F, invert=invert)
+        H_j = special_functions.sq_well_solve(x_j, a, b, F, invert=invert)
+        assert np.max(np.abs(H - H_j)) < 1.0e-10